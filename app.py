@@ -0,0 +1,104 @@
+from flask import Flask
+from config import config as cn
+from extensiones import db, ma, cors
+from comandos import COMANDOS
+from indice_productos import indice_productos
+from barrido_sesiones import barredor_sesiones
+from json_rapido import ProveedorJSONRapido
+import compresion
+
+import categoria
+import clientes
+import compra
+import detalle_compra
+import detalle_venta
+import marca
+import presentacion
+import producto
+import proveedor
+import reporte
+import rol
+import sesion
+import usuario
+import venta
+
+BLUEPRINTS = (
+    categoria.bp,
+    clientes.bp,
+    compra.bp,
+    detalle_compra.bp,
+    detalle_venta.bp,
+    marca.bp,
+    presentacion.bp,
+    producto.bp,
+    proveedor.bp,
+    reporte.bp,
+    rol.bp,
+    sesion.bp,
+    usuario.bp,
+    venta.bp,
+)
+
+
+def opciones_pool(url):
+    """Opciones del pool de conexiones compartido por todas las rutas del proceso."""
+    if url.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': getattr(cn, 'POOL_SIZE', 5),
+        'max_overflow': getattr(cn, 'POOL_MAX_OVERFLOW', 5),
+        'pool_timeout': getattr(cn, 'POOL_TIMEOUT', 10),
+        # Reciclar antes del wait_timeout del servidor evita conexiones muertas en el pool
+        'pool_recycle': getattr(cn, 'POOL_RECYCLE', 280),
+        'pool_pre_ping': True,
+    }
+
+
+def create_app(configuracion=None):
+    """Crea la aplicación con todas las entidades registradas como blueprints."""
+    app = Flask(__name__)
+    # Los ajustes en mayúsculas de config (TAMANIO_PAGINA_MAXIMO, CACHE_CATALOGOS_TTL, ...)
+    # pasan a app.config
+    app.config.from_object(cn)
+    app.config['SQLALCHEMY_DATABASE_URI'] = cn.DATABASE_URL
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if configuracion:
+        app.config.update(configuracion)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', opciones_pool(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    # Serializador JSON (orjson si está instalado); JSON_RAPIDO=False vuelve al de Flask
+    if app.config.get('JSON_RAPIDO', True):
+        app.json = ProveedorJSONRapido(app)
+
+    db.init_app(app)
+    ma.init_app(app)
+    cors.init_app(app, resources={r"/*": {"origins": "*"}})
+    compresion.init_app(app)
+
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
+
+    # El esquema se crea con `flask --app app crear_esquema`; crear la aplicación
+    # no abre conexiones, la primera se toma del pool en la primera petición.
+    for comando in COMANDOS:
+        app.cli.add_command(comando)
+
+    # Barrido periódico de sesiones expiradas en un hilo de este worker (opcional)
+    if app.config.get('BARRIDO_SESIONES'):
+        barredor_sesiones.iniciar(app)
+
+    # La purga de respuestas idempotentes vencidas arranca con la primera petición
+    # que trae Idempotency-Key (ver idempotencia.py)
+
+    # Precarga opcional del índice de códigos de barras (única E/S a la base al arrancar)
+    if app.config.get('PRECARGAR_INDICE_PRODUCTOS'):
+        with app.app_context():
+            indice_productos.cargar()
+
+    return app
+
+
+# Servidor de desarrollo (FLASK_DEBUG=1 activa el depurador); en producción usar
+# gunicorn -c gunicorn.conf.py wsgi:app
+if __name__ == "__main__":
+    create_app().run(port=4040, host="localhost")
@@ -0,0 +1,112 @@
+import threading
+import time
+from datetime import date, datetime
+
+from extensiones import db
+from modelos import Sesion
+from tareas_periodicas import TareaPeriodica
+from tokens_sesion import sesiones_activas
+
+# Sesiones que se cierran por sentencia y segundos entre barridos del hilo en
+# segundo plano; se pueden sobreescribir en la configuración con
+# TAMANIO_LOTE_BARRIDO y BARRIDO_SESIONES_INTERVALO. El hilo solo arranca con
+# BARRIDO_SESIONES=True.
+TAMANIO_LOTE_BARRIDO = 500
+BARRIDO_SESIONES_INTERVALO = 300
+
+ESTADO_EXPIRADA = 'expirada'
+
+
+def barrer(tamanio=TAMANIO_LOTE_BARRIDO):
+    """Marca como expiradas las sesiones activas cuya fecha_final ya pasó; devuelve cuántas cerró.
+
+    Trabaja por lotes de ``tamanio`` con un commit por lote para no mantener
+    bloqueos largos: lee los folios con LIMIT (el UPDATE ... LIMIT no es
+    portable) y actualiza solo los que siguen activos.
+    """
+    hoy = date.today()
+    total = 0
+    while True:
+        folios = [folio for folio, in (
+            db.session.query(Sesion.folio_sesion)
+            .filter(Sesion.estado == 'activa', Sesion.fecha_final < hoy)
+            .order_by(Sesion.fecha_final)
+            .limit(tamanio)
+        )]
+        if not folios:
+            return total
+        resultado = db.session.execute(
+            Sesion.__table__.update()
+            .where(Sesion.folio_sesion.in_(folios))
+            .where(Sesion.estado == 'activa')
+            .values(estado=ESTADO_EXPIRADA)
+        )
+        db.session.commit()
+        sesiones_activas.revocar(*folios)
+        total += resultado.rowcount
+        if len(folios) < tamanio:
+            return total
+
+
+class BarredorSesiones:
+    """Ejecuta barrer() periódicamente en una TareaPeriodica y lleva sus métricas."""
+
+    def __init__(self):
+        self._tarea = TareaPeriodica(
+            'barrido_sesiones', self._barrer, 'BARRIDO_SESIONES_INTERVALO',
+            BARRIDO_SESIONES_INTERVALO, 'el barrido de sesiones expiradas')
+        self._candado = threading.Lock()
+        self.barridos = 0
+        self.filas_barridas = 0
+        self.duracion_total_s = 0.0
+        self.ultima_duracion_s = None
+        self.ultimas_filas = None
+        self.ultimo_barrido = None
+        self.ultimo_error = None
+
+    def ejecutar(self, tamanio=TAMANIO_LOTE_BARRIDO):
+        """Un barrido con registro de métricas; se usa desde el hilo y desde el comando de consola."""
+        inicio = time.perf_counter()
+        try:
+            filas = barrer(tamanio)
+        except Exception as error:
+            db.session.rollback()
+            with self._candado:
+                self.ultimo_error = '%s: %s' % (type(error).__name__, error)
+            raise
+        duracion = time.perf_counter() - inicio
+        with self._candado:
+            self.barridos += 1
+            self.filas_barridas += filas
+            self.duracion_total_s += duracion
+            self.ultima_duracion_s = duracion
+            self.ultimas_filas = filas
+            self.ultimo_barrido = datetime.now().isoformat(timespec='seconds')
+            self.ultimo_error = None
+        return filas
+
+    def _barrer(self, app):
+        self.ejecutar(app.config.get('TAMANIO_LOTE_BARRIDO', TAMANIO_LOTE_BARRIDO))
+
+    def iniciar(self, app):
+        """Arranca el hilo del worker; llamadas repetidas no crean otro."""
+        self._tarea.iniciar(app)
+
+    def detener(self):
+        self._tarea.detener()
+
+    def estadisticas(self):
+        with self._candado:
+            return {
+                'activo': self._tarea.activa(),
+                'barridos': self.barridos,
+                'filas_barridas': self.filas_barridas,
+                'duracion_total_s': round(self.duracion_total_s, 6),
+                'ultima_duracion_s': None if self.ultima_duracion_s is None else round(self.ultima_duracion_s, 6),
+                'ultimas_filas': self.ultimas_filas,
+                'ultimo_barrido': self.ultimo_barrido,
+                'ultimo_error': self.ultimo_error,
+            }
+
+
+barredor_sesiones = BarredorSesiones()
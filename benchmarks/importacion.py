@@ -0,0 +1,74 @@
+"""Importación de clientes desde CSV/NDJSON: tiempo y memoria máxima.
+
+Genera un archivo de ``--filas`` clientes, lo envía en streaming a
+/cliente/importar sobre una base SQLite temporal y reporta duración, filas por
+segundo y el pico de memoria asignada (tracemalloc) durante la importación,
+que debe mantenerse plano al crecer el archivo.
+
+    python benchmarks/importacion.py --filas 100000
+    python benchmarks/importacion.py --filas 100000 --formato ndjson
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from extensiones import db  # noqa: E402
+
+CAMPOS = ('clv_cliente', 'nombre', 'apellido1', 'apellido2', 'telefono', 'correo')
+TIPOS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def generar(ruta, filas, formato):
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        if formato == 'csv':
+            escritor = csv.writer(archivo)
+            escritor.writerow(CAMPOS)
+        for i in range(filas):
+            registro = ('CLI%012d' % i, 'Nombre %d' % i, 'Apellido', 'Segundo', '555%07d' % i, 'c%d@correo.mx' % i)
+            if formato == 'csv':
+                escritor.writerow(registro)
+            else:
+                archivo.write(json.dumps(dict(zip(CAMPOS, registro))) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--formato', choices=TIPOS, default='csv')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'clientes.' + args.formato)
+        generar(ruta, args.filas, args.formato)
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(directorio, 'importacion.db')})
+        with app.app_context():
+            db.create_all()
+        cliente = app.test_client()
+
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        with open(ruta, 'rb') as archivo:
+            respuesta = cliente.post('/cliente/importar', input_stream=archivo,
+                                     content_type=TIPOS[args.formato],
+                                     headers={'Content-Length': str(os.path.getsize(ruta))})
+        duracion = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        resumen = respuesta.get_json()
+        print('archivo      %.1f MB, %d filas (%s)' % (os.path.getsize(ruta) / 1e6, args.filas, args.formato))
+        print('insertados   %d, rechazados %d' % (resumen['insertados'], resumen['rechazados']))
+        print('duración     %.2f s (%.0f filas/s)' % (duracion, args.filas / duracion))
+        print('memoria pico %.1f MB' % (pico / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Listados con marshmallow dump() contra el serializador compilado por tuplas.
+
+Crea una base SQLite temporal con ``--filas`` productos y detalles de venta y
+mide /producto y /detalle_venta pidiendo la tabla completa en una sola página,
+más las exportaciones NDJSON de detalles y ventas, primero con el camino
+anterior (instancias del ORM y esquema.dump()) y después con
+serializacion.serializador().
+
+    python benchmarks/listados.py --filas 100000
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from extensiones import db  # noqa: E402
+from modelos import DetalleVenta, Producto, Sesion, Venta  # noqa: E402
+import exportacion  # noqa: E402
+import paginacion  # noqa: E402
+import serializacion  # noqa: E402
+
+
+def poblar(app, filas):
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Producto.__table__.insert(), [
+            dict(codigo_barras='750%010d' % i, nombre='Producto %d' % i, descripcion='Descripción %d' % i,
+                 cantidad_actual=i % 50, cantidad_maxima=100, cantidad_minima=10,
+                 precio='%d.%02d' % (i % 300, i % 100), estado='activo')
+            for i in range(filas)
+        ])
+        db.session.execute(Sesion.__table__.insert(), [dict(folio_sesion='S1', clv_usuario=None, fecha_inicio=datetime.date.today(),
+                                                             fecha_final=datetime.date.today(), estado='activa')])
+        db.session.execute(Venta.__table__.insert(), [
+            dict(folio_venta='V%07d' % i, folio_sesion='S1', clv_cliente='C1', fecha_venta=datetime.date.today(), total_venta=0)
+            for i in range(filas // 10)
+        ])
+        db.session.execute(DetalleVenta.__table__.insert(), [
+            dict(folio_venta='V%07d' % (i // 10), codigo_barras='750%010d' % i, cantidad=1 + i % 5,
+                 precio_venta='%d.%02d' % (i % 300, i % 100))
+            for i in range(filas)
+        ])
+        db.session.commit()
+
+
+def medir(cliente, ruta, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        respuesta = cliente.get(ruta)
+        respuesta.get_data()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(directorio, 'listados.db'),
+                          'TAMANIO_PAGINA_MAXIMO': args.filas, 'COMPRIMIR_RESPUESTAS': False})
+        poblar(app, args.filas)
+        cliente = app.test_client()
+        rutas = {
+            '/producto (página completa)': '/producto?limite=%d' % args.filas,
+            '/detalle_venta (página completa)': '/detalle_venta?limite=%d' % args.filas,
+            '/detalle_venta/exportar': '/detalle_venta/exportar',
+            '/venta/exportar': '/venta/exportar',
+        }
+
+        compilado = serializacion.serializador
+        resultados = {}
+        for nombre, funcion in (('dump()', lambda *args, **kwargs: None), ('compilado', compilado)):
+            paginacion.serializador = exportacion.serializador = funcion
+            for ruta, url in rutas.items():
+                resultados.setdefault(ruta, []).append(medir(cliente, url, args.repeticiones))
+        paginacion.serializador = exportacion.serializador = compilado
+
+        print('%-34s %10s %10s %8s' % ('%d filas' % args.filas, 'dump()', 'compilado', 'mejora'))
+        for ruta, (antes, despues) in resultados.items():
+            print('%-34s %8.0f ms %8.0f ms %7.1fx' % (ruta, antes, despues, antes / despues))
+
+
+if __name__ == '__main__':
+    main()
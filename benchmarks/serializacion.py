@@ -0,0 +1,80 @@
+"""Serialización JSON y bytes transferidos de /producto antes y después.
+
+Crea una base SQLite temporal con ``--filas`` productos y, para el proveedor
+JSON de Flask (JSON_RAPIDO=False) y el de json_rapido (orjson si está
+instalado), mide el tiempo medio de serializar una página de productos ya
+convertida por el esquema y el de la petición completa. Después muestra los
+bytes de la misma respuesta sin compresión, con gzip y con brotli.
+
+    python benchmarks/serializacion.py --filas 5000 --repeticiones 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from compresion import brotli  # noqa: E402
+from extensiones import db  # noqa: E402
+from json_rapido import orjson  # noqa: E402
+from modelos import Producto  # noqa: E402
+from producto import productosSchema  # noqa: E402
+
+
+def poblar(app, filas):
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Producto.__table__.insert(), [
+            dict(codigo_barras='750%010d' % i, nombre='Producto %d' % i, descripcion='Descripción del producto %d' % i,
+                 cantidad_actual=i % 50, cantidad_maxima=100, cantidad_minima=10, precio='%d.%02d' % (i % 300, i % 100),
+                 estado='activo')
+            for i in range(filas)
+        ])
+        db.session.commit()
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=5000)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        url = 'sqlite:///' + os.path.join(directorio, 'serializacion.db')
+        ruta = '/producto?limite=%d' % args.filas
+        print('orjson %s, brotli %s' % ('instalado' if orjson else 'no instalado',
+                                        'instalado' if brotli else 'no instalado'))
+        for rapido in (False, True):
+            app = create_app({'SQLALCHEMY_DATABASE_URI': url, 'JSON_RAPIDO': rapido, 'TAMANIO_PAGINA_MAXIMO': args.filas,
+                              'COMPRIMIR_RESPUESTAS': False})
+            if not rapido:
+                poblar(app, args.filas)
+            with app.app_context():
+                datos = {'datos': productosSchema.dump(Producto.query.order_by(Producto.codigo_barras).all())}
+                ms_json, _ = medir(lambda: app.json.dumps(datos), args.repeticiones)
+            cliente = app.test_client()
+            ms_peticion, _ = medir(lambda: cliente.get(ruta), args.repeticiones)
+            print('%-22s json.dumps %7.2f ms   petición %7.2f ms' % (
+                'json_rapido' if rapido else 'Flask (json estándar)', ms_json, ms_peticion))
+
+        app = create_app({'SQLALCHEMY_DATABASE_URI': url, 'TAMANIO_PAGINA_MAXIMO': args.filas})
+        cliente = app.test_client()
+        codificaciones = ['identity', 'gzip'] + (['br'] if brotli else [])
+        for codificacion in codificaciones:
+            ms, respuesta = medir(lambda: cliente.get(ruta, headers={'Accept-Encoding': codificacion}),
+                                  args.repeticiones)
+            print('%-9s %9d bytes   petición %7.2f ms' % (codificacion, len(respuesta.get_data()), ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Compara el rendimiento del servidor de desarrollo contra gunicorn.
+
+Levanta cada servidor contra la misma base de datos, lanza ``--clientes``
+conexiones concurrentes con keep-alive durante ``--duracion`` segundos y
+reporta peticiones por segundo, latencias p50/p99 y errores. Sirve para
+dimensionar workers/hilos de cada sucursal: repetir con distintos valores de
+POS_WORKERS y POS_THREADS hasta que p99 deje de mejorar.
+
+    python benchmarks/servidor.py --ruta "/producto?limite=50" --clientes 32 --duracion 20
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DESARROLLO = (
+    "from app import create_app; "
+    "create_app().run(debug=True, use_reloader=False, host='127.0.0.1', port=%d)"
+)
+
+
+def esperar_puerto(puerto, limite=20):
+    fin = time.time() + limite
+    while time.time() < fin:
+        try:
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=1)
+            conexion.request('GET', '/')
+            conexion.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('El servidor no respondió en el puerto %d' % puerto)
+
+
+def cliente(puerto, ruta, fin, latencias, errores):
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=10)
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        try:
+            conexion.request('GET', ruta)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status >= 500:
+                errores.append(respuesta.status)
+        except (OSError, http.client.HTTPException) as error:
+            errores.append(error)
+            conexion.close()
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=10)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+
+
+def cargar(puerto, ruta, clientes, duracion):
+    latencias, errores = [], []
+    fin = time.perf_counter() + duracion
+    hilos = [threading.Thread(target=cliente, args=(puerto, ruta, fin, latencias, errores)) for _ in range(clientes)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return latencias, errores
+
+
+def medir(nombre, comando, puerto, args):
+    # Sin bitácora de accesos para no medir escritura a disco
+    entorno = dict(os.environ, POS_ACCESSLOG='')
+    proceso = subprocess.Popen(comando, cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        esperar_puerto(puerto)
+        cargar(puerto, args.ruta, args.clientes, 2)  # calentamiento
+        latencias, errores = cargar(puerto, args.ruta, args.clientes, args.duracion)
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+    latencias.sort()
+    print('%-12s %8.1f req/s  p50 %7.1f ms  p99 %7.1f ms  errores %d' % (
+        nombre,
+        len(latencias) / args.duracion,
+        statistics.median(latencias) * 1000 if latencias else 0,
+        latencias[int(len(latencias) * 0.99) - 1] * 1000 if latencias else 0,
+        len(errores),
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ruta', default='/categoria')
+    parser.add_argument('--clientes', type=int, default=16)
+    parser.add_argument('--duracion', type=float, default=10)
+    parser.add_argument('--puerto', type=int, default=4099)
+    args = parser.parse_args()
+
+    medir('desarrollo', [sys.executable, '-c', DESARROLLO % args.puerto], args.puerto, args)
+    medir('gunicorn', [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                       '-b', '127.0.0.1:%d' % args.puerto, 'wsgi:app'],
+          args.puerto, args)
+
+
+if __name__ == '__main__':
+    main()
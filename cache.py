@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, make_response, request
+
+# Segundos que una respuesta de catálogo permanece en memoria; se puede
+# sobreescribir en la configuración con CACHE_CATALOGOS_TTL.
+CACHE_CATALOGOS_TTL = 300
+
+
+class CacheTTL:
+    """Diccionario en memoria con expiración por entrada y tamaño máximo (LRU), seguro entre hilos."""
+
+    def __init__(self, maximo=1024):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._candado = threading.Lock()
+
+    def __len__(self):
+        return len(self._datos)
+
+    def obtener(self, llave):
+        with self._candado:
+            entrada = self._datos.get(llave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._datos[llave]
+                return None
+            self._datos.move_to_end(llave)
+            return valor
+
+    def guardar(self, llave, valor, ttl):
+        with self._candado:
+            self._datos[llave] = (time.monotonic() + ttl, valor)
+            self._datos.move_to_end(llave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def eliminar(self, llave):
+        with self._candado:
+            self._datos.pop(llave, None)
+
+    def invalidar(self, condicion=None):
+        """Elimina todas las entradas, o solo aquellas cuya llave cumpla la condición."""
+        with self._candado:
+            if condicion is None:
+                self._datos.clear()
+                return
+            for llave in [llave for llave in self._datos if condicion(llave)]:
+                del self._datos[llave]
+
+
+cache_catalogos = CacheTTL()
+
+
+def cacheado(grupo):
+    """Sirve desde memoria las respuestas 200 de una ruta GET de catálogo, con ETag.
+
+    Los clientes que envían If-None-Match con el ETag vigente reciben 304 sin cuerpo.
+    Las rutas que modifican el catálogo deben llamar a invalidar(grupo).
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            llave = (grupo, request.full_path)
+            guardado = cache_catalogos.obtener(llave)
+            if guardado is None:
+                respuesta = make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200:
+                    return respuesta
+                respuesta.add_etag()
+                guardado = (respuesta.get_data(), respuesta.mimetype, respuesta.get_etag()[0])
+                ttl = current_app.config.get('CACHE_CATALOGOS_TTL', CACHE_CATALOGOS_TTL)
+                cache_catalogos.guardar(llave, guardado, ttl)
+
+            cuerpo, mimetype, etag = guardado
+            respuesta = Response(cuerpo, mimetype=mimetype)
+            respuesta.set_etag(etag)
+            # El cliente puede guardar la respuesta pero debe revalidarla con el ETag
+            respuesta.cache_control.no_cache = True
+            return respuesta.make_conditional(request)
+        return envoltura
+    return decorador
+
+
+def invalidar(grupo):
+    """Descarta las respuestas en memoria de un catálogo tras modificarlo."""
+    cache_catalogos.invalidar(lambda llave: llave[0] == grupo)
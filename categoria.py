@@ -1,27 +1,10 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
-from flask_cors import CORS
-from config.config import DATABASE_URL
+from flask import Blueprint, jsonify, request
+from paginacion import paginar
+from cache import cacheado, invalidar
+from extensiones import db, ma
+from modelos import Categoria
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-CORS(app)
-
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
-
-# Definición del modelo Categoria
-class Categoria(db.Model):
-    id_categoria = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    descripcion = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, nombre, descripcion):
-        self.nombre = nombre
-        self.descripcion = descripcion
+bp = Blueprint('categoria', __name__)
 
 # Definición del esquema Categoria
 class CategoriaSchema(ma.Schema):
@@ -32,20 +15,20 @@ categoria_schema = CategoriaSchema()
 categorias_schema = CategoriaSchema(many=True)
 
 # Métodos de la API
-@app.route('/categoria', methods=['GET'])
+@bp.route('/categoria', methods=['GET'])
+@cacheado('categoria')
 def obtenerCategorias():
-    todas_las_categorias = Categoria.query.all()
-    consulta_categorias = categorias_schema.dump(todas_las_categorias)
-    return jsonify(consulta_categorias)
+    return paginar(Categoria.query, Categoria.id_categoria, categorias_schema)
 
-@app.route('/categoria/<int:id_categoria>', methods=['GET'])
+@bp.route('/categoria/<int:id_categoria>', methods=['GET'])
+@cacheado('categoria')
 def obtenerCategoria(id_categoria):
     una_categoria = Categoria.query.get(id_categoria)
     if una_categoria is None:
         return jsonify({'message': 'Categoría no encontrada'}), 404
     return categoria_schema.jsonify(una_categoria)
 
-@app.route('/categoria/nueva_categoria', methods=['POST'])
+@bp.route('/categoria/nueva_categoria', methods=['POST'])
 def insertarCategoria():
     datosJSON = request.get_json(force=True)
     nombre = datosJSON.get('nombre')
@@ -57,9 +40,10 @@ def insertarCategoria():
     nueva_categoria = Categoria(nombre, descripcion)
     db.session.add(nueva_categoria)
     db.session.commit()
+    invalidar('categoria')
     return categoria_schema.jsonify(nueva_categoria), 201
 
-@app.route('/categoria/actualizar_categoria/<int:id_categoria>', methods=['PUT'])
+@bp.route('/categoria/actualizar_categoria/<int:id_categoria>', methods=['PUT'])
 def actualizarCategoria(id_categoria):
     actualizar_categoria = Categoria.query.get(id_categoria)
     if actualizar_categoria is None:
@@ -73,9 +57,10 @@ def actualizarCategoria(id_categoria):
     actualizar_categoria.descripcion = descripcion
 
     db.session.commit()
+    invalidar('categoria')
     return categoria_schema.jsonify(actualizar_categoria)
 
-@app.route('/categoria/eliminar_categoria/<int:id_categoria>', methods=['DELETE'])
+@bp.route('/categoria/eliminar_categoria/<int:id_categoria>', methods=['DELETE'])
 def eliminarCategoria(id_categoria):
     eliminar_categoria = Categoria.query.get(id_categoria)
     if eliminar_categoria is None:
@@ -83,8 +68,5 @@ def eliminarCategoria(id_categoria):
 
     db.session.delete(eliminar_categoria)
     db.session.commit()
+    invalidar('categoria')
     return categoria_schema.jsonify(eliminar_categoria)
-
-if __name__ == "__main__":
-    app.run(debug=True, port=4040, host="127.0.0.1")
-
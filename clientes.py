@@ -1,44 +1,22 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
-from flask_cors import CORS
-from config import config as cn
-
-# Configuración de la aplicación y la base de datos
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = cn.DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Configuración de CORS
-CORS(app)
-CORS(app, resources={r"/*": {"origins": "*"}})
-
-# Inicialización de SQLAlchemy y Marshmallow
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
-
-# Definición del modelo Cliente
-class Cliente(db.Model):
-    clv_cliente = db.Column(db.String(18), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    apellido1 = db.Column(db.String(255), nullable=False)
-    apellido2 = db.Column(db.String(255), nullable=False)
-    telefono = db.Column(db.String(255), nullable=False)
-    correo = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, clv_cliente, nombre, apellido1, apellido2, telefono, correo):
-        self.clv_cliente = clv_cliente
-        self.nombre = nombre
-        self.apellido1 = apellido1
-        self.apellido2 = apellido2
-        self.telefono = telefono
-        self.correo = correo
-
-with app.app_context():
-    db.create_all()
+from flask import Blueprint, jsonify, request
+from marshmallow.validate import Length
+from paginacion import paginar
+from importacion import formato_solicitado, importar
+from extensiones import db, ma
+from modelos import Cliente
+
+bp = Blueprint('cliente', __name__)
 
 # Definición del esquema Cliente
 class ClienteSchema(ma.Schema):
+    # Validación usada al importar clientes
+    clv_cliente = ma.String(required=True, validate=Length(min=1, max=18))
+    nombre = ma.String(required=True, validate=Length(min=1, max=255))
+    apellido1 = ma.String(required=True, validate=Length(min=1, max=255))
+    apellido2 = ma.String(required=True, validate=Length(min=1, max=255))
+    telefono = ma.String(required=True, validate=Length(min=1, max=255))
+    correo = ma.String(required=True, validate=Length(min=1, max=255))
+
     class Meta:
         fields = ('clv_cliente', 'nombre', 'apellido1', 'apellido2', 'telefono', 'correo')
 
@@ -49,14 +27,12 @@ clientes_schema = ClienteSchema(many=True)
 # Rutas de la API
 
 # GET todos los clientes
-@app.route('/cliente', methods=['GET'])
+@bp.route('/cliente', methods=['GET'])
 def obtenerClientes():
-    todos_los_clientes = Cliente.query.all()
-    consulta_clientes = clientes_schema.dump(todos_los_clientes)
-    return jsonify(consulta_clientes)
+    return paginar(Cliente.query, Cliente.clv_cliente, clientes_schema)
 
 # GET un cliente por clave
-@app.route('/cliente/<string:clv_cliente>', methods=['GET'])
+@bp.route('/cliente/<string:clv_cliente>', methods=['GET'])
 def obtenerCliente(clv_cliente):
     un_cliente = Cliente.query.get(clv_cliente)
     if un_cliente is None:
@@ -64,7 +40,7 @@ def obtenerCliente(clv_cliente):
     return cliente_schema.jsonify(un_cliente)
 
 # POST nuevo cliente
-@app.route('/cliente/nuevo_cliente', methods=['POST'])
+@bp.route('/cliente/nuevo_cliente', methods=['POST'])
 def insertar_cliente():
     datosJSON = request.get_json(force=True)
     clv_cliente = datosJSON.get('clv_cliente')
@@ -82,8 +58,16 @@ def insertar_cliente():
     db.session.commit()
     return cliente_schema.jsonify(nuevo_cliente), 201
 
+# POST importar clientes desde CSV o NDJSON, leyendo el cuerpo de forma incremental
+@bp.route('/cliente/importar', methods=['POST'])
+def importar_clientes():
+    formato = formato_solicitado()
+    if formato is None:
+        return jsonify({'message': 'Envíe text/csv o application/x-ndjson'}), 415
+    return jsonify(importar(Cliente, cliente_schema, request.stream, formato))
+
 # PUT actualizar cliente
-@app.route('/cliente/actualizar_cliente/<string:clv_cliente>', methods=['PUT'])
+@bp.route('/cliente/actualizar_cliente/<string:clv_cliente>', methods=['PUT'])
 def actualizarCliente(clv_cliente):
     actualizar_cliente = Cliente.query.get(clv_cliente)
     if actualizar_cliente is None:
@@ -100,7 +84,7 @@ def actualizarCliente(clv_cliente):
     return cliente_schema.jsonify(actualizar_cliente)
 
 # DELETE eliminar cliente
-@app.route('/cliente/eliminar_cliente/<string:clv_cliente>', methods=['DELETE'])
+@bp.route('/cliente/eliminar_cliente/<string:clv_cliente>', methods=['DELETE'])
 def eliminarCliente(clv_cliente):
     eliminar_cliente = Cliente.query.get(clv_cliente)
     if eliminar_cliente is None:
@@ -109,7 +93,3 @@ def eliminarCliente(clv_cliente):
     db.session.delete(eliminar_cliente)
     db.session.commit()
     return cliente_schema.jsonify(eliminar_cliente)
-
-if __name__ == "__main__":
-    app.run(debug=True, port=4043, host="localhost")
-
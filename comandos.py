@@ -0,0 +1,110 @@
+import click
+from flask.cli import with_appcontext
+from datetime import datetime
+from sqlalchemy import case, func, literal
+from extensiones import db
+from inventario import APERTURA, CONCILIACION
+from barrido_sesiones import TAMANIO_LOTE_BARRIDO, barredor_sesiones
+from idempotencia import TAMANIO_LOTE_PURGA, purgar
+from modelos import DetalleVenta, MovimientoInventario, Producto, Sesion, Venta, VentaDiaria
+
+
+# Paso explícito de migración: el arranque de la aplicación ya no toca el esquema
+@click.command('crear_esquema')
+@with_appcontext
+def crear_esquema():
+    """Crea las tablas que todavía no existan en la base de datos."""
+    db.create_all()
+    click.echo('Esquema creado')
+
+
+# Recalcula venta_diaria desde el historial completo; sirve para la carga inicial y
+# para incorporar ventas registradas por las rutas que no pasan por /venta/cobrar
+@click.command('reconstruir_ventas_diarias')
+@with_appcontext
+def reconstruir_ventas_diarias():
+    """Vuelve a calcular la tabla venta_diaria a partir de venta y detalle_venta."""
+    acumulado = (
+        db.select(
+            Venta.fecha_venta,
+            Venta.folio_sesion,
+            DetalleVenta.codigo_barras,
+            func.max(Sesion.clv_usuario),
+            func.sum(DetalleVenta.cantidad),
+            func.sum(DetalleVenta.cantidad * DetalleVenta.precio_venta),
+            func.count(),
+        )
+        .select_from(DetalleVenta)
+        .join(Venta, DetalleVenta.folio_venta == Venta.folio_venta)
+        .outerjoin(Sesion, Venta.folio_sesion == Sesion.folio_sesion)
+        .group_by(Venta.fecha_venta, Venta.folio_sesion, DetalleVenta.codigo_barras)
+    )
+    tabla = VentaDiaria.__table__
+    db.session.execute(tabla.delete())
+    db.session.execute(tabla.insert().from_select(
+        ['fecha_venta', 'folio_sesion', 'codigo_barras', 'clv_usuario', 'cantidad', 'importe', 'lineas'],
+        acumulado,
+    ))
+    db.session.commit()
+    click.echo('Filas en venta_diaria: %d' % db.session.query(func.count()).select_from(tabla).scalar())
+
+
+# Tarea periódica (cron): compara cantidad_actual con la suma del historial de
+# movimientos. Los productos sin historial reciben su movimiento de apertura y las
+# diferencias (cambios hechos por fuera de las rutas que registran movimientos)
+# quedan asentadas como conciliación, así el historial vuelve a cuadrar.
+@click.command('conciliar_existencias')
+@with_appcontext
+def conciliar_existencias():
+    """Registra movimientos de apertura y conciliación para que el historial cuadre con cantidad_actual."""
+    sumas = (
+        db.select(MovimientoInventario.codigo_barras, func.sum(MovimientoInventario.cantidad).label('total'))
+        .group_by(MovimientoInventario.codigo_barras)
+        .subquery()
+    )
+    diferencia = Producto.cantidad_actual - func.coalesce(sumas.c.total, 0)
+    pendientes = (
+        db.select(
+            Producto.codigo_barras,
+            case((sumas.c.total.is_(None), APERTURA), else_=CONCILIACION),
+            diferencia,
+            literal('conciliar_existencias'),
+            literal(datetime.now()),
+        )
+        .outerjoin(sumas, sumas.c.codigo_barras == Producto.codigo_barras)
+        .where(diferencia != 0)
+    )
+    resultado = db.session.execute(MovimientoInventario.__table__.insert().from_select(
+        ['codigo_barras', 'tipo', 'cantidad', 'referencia', 'fecha_hora'],
+        pendientes,
+    ))
+    db.session.commit()
+    click.echo('Movimientos registrados: %d' % resultado.rowcount)
+
+
+# Alternativa al hilo de BARRIDO_SESIONES para ejecutarlo desde cron
+@click.command('barrer_sesiones')
+@click.option('--lote', default=TAMANIO_LOTE_BARRIDO, show_default=True, help='Sesiones por UPDATE')
+@with_appcontext
+def barrer_sesiones(lote):
+    """Marca como expiradas las sesiones activas cuya fecha_final ya pasó."""
+    filas = barredor_sesiones.ejecutar(lote)
+    click.echo('Sesiones expiradas: %d' % filas)
+
+
+# Alternativa al hilo de PURGA_IDEMPOTENCIA para ejecutarla desde cron
+@click.command('purgar_idempotencia')
+@click.option('--lote', default=TAMANIO_LOTE_PURGA, show_default=True, help='Respuestas por DELETE')
+@with_appcontext
+def purgar_idempotencia(lote):
+    """Borra las respuestas idempotentes vencidas."""
+    click.echo('Respuestas idempotentes purgadas: %d' % purgar(lote))
+
+
+COMANDOS = (
+    crear_esquema,
+    reconstruir_ventas_diarias,
+    conciliar_existencias,
+    barrer_sesiones,
+    purgar_idempotencia,
+)
@@ -1,129 +1,92 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
-from flask_cors import CORS
-from config import config as cn
+from functools import partial
+from flask import Blueprint, jsonify, request
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.exc import StaleDataError
+from paginacion import paginar, igual, desde, hasta
+from concurrencia import con_version, conflicto_version, verificar_if_match
+from idempotencia import confirmar, idempotente
+from exportacion import exportar
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from extensiones import db, ma
+from modelos import Compra, DetalleCompra, Producto
+from indice_productos import indice_productos
+from inventario import COMPRA, registrar_movimientos
 
-# Configuración de la aplicación y la base de datos
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = cn.DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Configuración de CORS
-CORS(app)
-CORS(app, resources={r"/*": {"origins": "*"}})
-
-# Inicialización de SQLAlchemy y Marshmallow
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
-
-# Definición del modelo Proveedor
-class Proveedor(db.Model):
-    rfc_proveedor = db.Column(db.String(255), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    telefono = db.Column(db.String(255), nullable=False)
-    correo = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, rfc_proveedor, nombre, telefono, correo):
-        self.rfc_proveedor = rfc_proveedor
-        self.nombre = nombre
-        self.telefono = telefono
-        self.correo = correo
-
-# Definición del modelo Rol
-class Rol(db.Model):
-    id_rol = db.Column(db.Integer, primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    descripcion = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, nombre, descripcion):
-        self.nombre = nombre
-        self.descripcion = descripcion
-
-# Definición del modelo Usuario
-class Usuario(db.Model):
-    clv_usuario = db.Column(db.String(18), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    apellido1 = db.Column(db.String(255), nullable=False)
-    apellido2 = db.Column(db.String(255), nullable=False)
-    telefono = db.Column(db.String(255), nullable=False)
-    correo = db.Column(db.String(255), nullable=False)
-    direccion = db.Column(db.String(255), nullable=False)
-    id_rol = db.Column(db.Integer, db.ForeignKey('rol.id_rol'), nullable=True)
-    contrasenia = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, clv_usuario, nombre, apellido1, apellido2, telefono, correo, direccion, id_rol, contrasenia):
-        self.clv_usuario = clv_usuario
-        self.nombre = nombre
-        self.apellido1 = apellido1
-        self.apellido2 = apellido2
-        self.telefono = telefono
-        self.correo = correo
-        self.direccion = direccion
-        self.id_rol = id_rol
-        self.contrasenia = contrasenia
-
-# Definición del modelo Sesion
-class Sesion(db.Model):
-    folio_sesion = db.Column(db.String(18), primary_key=True)
-    clv_usuario = db.Column(db.String(18), db.ForeignKey('usuario.clv_usuario'), nullable=True)
-    fecha_inicio = db.Column(db.Date, nullable=False)
-    fecha_final = db.Column(db.Date, nullable=False)
-    estado = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, folio_sesion, clv_usuario, fecha_inicio, fecha_final, estado):
-        self.folio_sesion = folio_sesion
-        self.clv_usuario = clv_usuario
-        self.fecha_inicio = fecha_inicio
-        self.fecha_final = fecha_final
-        self.estado = estado
-
-# Definición del modelo Compra
-class Compra(db.Model):
-    folio_compra = db.Column(db.String(255), primary_key=True)
-    folio_sesion = db.Column(db.String(18), db.ForeignKey('sesion.folio_sesion'), nullable=False)
-    rfc_proveedor = db.Column(db.String(255), db.ForeignKey('proveedor.rfc_proveedor'), nullable=False)
-    fecha_compra = db.Column(db.Date, nullable=False)
-    total_compra = db.Column(db.Float, nullable=False)
-
-    def __init__(self, folio_compra, folio_sesion, rfc_proveedor, fecha_compra, total_compra):
-        self.folio_compra = folio_compra
-        self.folio_sesion = folio_sesion
-        self.rfc_proveedor = rfc_proveedor
-        self.fecha_compra = fecha_compra
-        self.total_compra = total_compra
-
-with app.app_context():
-    db.create_all()
-
+bp = Blueprint('compra', __name__)
 
 # Definición del esquema Compra
 class CompraSchema(ma.Schema):
     class Meta:
         fields = ('folio_compra', 'folio_sesion', 'rfc_proveedor', 'fecha_compra', 'total_compra')
 
+class DetalleCompraSchema(ma.Schema):
+    class Meta:
+        fields = ('id_detalle_compra', 'folio_compra', 'codigo_barras', 'cantidad', 'precio_compra')
+
+# Detalle con el nombre del producto, para imprimir el ticket
+class DetalleCompraProductoSchema(DetalleCompraSchema):
+    nombre_producto = ma.String(attribute='producto.nombre')
+
+    class Meta:
+        fields = DetalleCompraSchema.Meta.fields + ('nombre_producto',)
+
+class CompraConDetallesSchema(CompraSchema):
+    detalles = ma.Nested(DetalleCompraProductoSchema, many=True)
+
+    class Meta:
+        fields = CompraSchema.Meta.fields + ('detalles',)
+
 # Instancias de los esquemas
 compra_schema = CompraSchema()
 compras_schema = CompraSchema(many=True)
+detalles_compra_schema = DetalleCompraSchema(many=True)
+compra_con_detalles_schema = CompraConDetallesSchema()
+
+# Filtros aceptados por GET /compra
+FILTROS_COMPRA = {
+    'desde': desde(Compra.fecha_compra),
+    'hasta': hasta(Compra.fecha_compra),
+    'folio_sesion': igual(Compra.folio_sesion),
+    'rfc_proveedor': igual(Compra.rfc_proveedor),
+}
 
 # GET todas las compras
-@app.route('/compra', methods=['GET'])
+@bp.route('/compra', methods=['GET'])
 def obtenerCompras():
-    todas_las_compras = Compra.query.all()
-    consulta_compras = compras_schema.dump(todas_las_compras)
-    return jsonify(consulta_compras)
+    return paginar(Compra.query, Compra.folio_compra, compras_schema, FILTROS_COMPRA)
+
+# GET exportar todas las compras en streaming (NDJSON o arreglo JSON)
+@bp.route('/compra/exportar', methods=['GET'])
+def exportarCompras():
+    return exportar(Compra.query, Compra.folio_compra, compra_schema)
 
 # GET una compra por id
-@app.route('/compra/<string:folio_compra>', methods=['GET'])
+@bp.route('/compra/<string:folio_compra>', methods=['GET'])
 def obtenerCompra(folio_compra):
     una_compra = Compra.query.get(folio_compra)
     if una_compra is None:
         return jsonify({'message': 'Compra no encontrada'}), 404
-    return compra_schema.jsonify(una_compra)
+    return con_version(compra_schema.jsonify(una_compra), una_compra.version)
+
+# GET una compra con sus detalles y el nombre de cada producto en una sola consulta
+@bp.route('/compra/<string:folio_compra>/detalles', methods=['GET'])
+def obtenerCompraConDetalles(folio_compra):
+    una_compra = (
+        Compra.query
+        .options(joinedload(Compra.detalles).joinedload(DetalleCompra.producto).load_only(Producto.nombre))
+        .filter(Compra.folio_compra == folio_compra)
+        .one_or_none()
+    )
+    if una_compra is None:
+        return jsonify({'message': 'Compra no encontrada'}), 404
+    return con_version(compra_con_detalles_schema.jsonify(una_compra), una_compra.version)
 
 # POST nueva compra
-@app.route('/compra/nueva_compra', methods=['POST'])
+@bp.route('/compra/nueva_compra', methods=['POST'])
+@idempotente
 def insertar_compra():
     datosJSON = request.get_json(force=True)
     folio_compra = datosJSON.get('folio_compra')
@@ -137,15 +100,131 @@ def insertar_compra():
 
     nueva_compra = Compra(folio_compra, folio_sesion, rfc_proveedor, fecha_compra, total_compra)
     db.session.add(nueva_compra)
-    db.session.commit()
+    try:
+        confirmar()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'El folio ya existe o la compra hace referencia a datos inexistentes'}), 409
     return compra_schema.jsonify(nueva_compra), 201
 
+# POST recibir compra: encabezado, detalles y reabastecimiento en una sola transacción
+@bp.route('/compra/recibir_compra', methods=['POST'])
+@idempotente
+def recibir_compra():
+    datosJSON = request.get_json(force=True)
+    if not isinstance(datosJSON, dict):
+        return jsonify({'message': 'El cuerpo debe ser un objeto JSON'}), 400
+    folio_compra = datosJSON.get('folio_compra')
+    folio_sesion = datosJSON.get('folio_sesion')
+    rfc_proveedor = datosJSON.get('rfc_proveedor')
+    fecha_compra = datosJSON.get('fecha_compra')
+    detalles = datosJSON.get('detalles')
+    # Entrega parcial: agregar las líneas a una compra ya registrada
+    entrega_parcial = datosJSON.get('entrega_parcial', False)
+
+    if not folio_sesion or not folio_compra or not rfc_proveedor or not fecha_compra or not detalles:
+        return jsonify({'message': 'Faltan datos necesarios'}), 400
+    if not isinstance(entrega_parcial, bool):
+        return jsonify({'message': 'entrega_parcial debe ser true o false'}), 400
+    try:
+        fecha_compra = datetime.strptime(fecha_compra, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return jsonify({'message': 'fecha_compra debe tener el formato AAAA-MM-DD'}), 400
+    if not isinstance(detalles, list):
+        return jsonify({'message': 'detalles debe ser una lista'}), 400
+
+    # Cantidad total recibida por producto (un producto puede venir en varias líneas)
+    cantidades = {}
+    lineas = []
+    for detalle in detalles:
+        if not isinstance(detalle, dict):
+            return jsonify({'message': 'Detalle de compra inválido', 'detalle': detalle}), 400
+        codigo_barras = detalle.get('codigo_barras')
+        cantidad = detalle.get('cantidad')
+        try:
+            precio_compra = Decimal(str(detalle.get('precio_compra')))
+        except InvalidOperation:
+            precio_compra = None
+        if not isinstance(codigo_barras, str) or not codigo_barras or not isinstance(cantidad, int) or isinstance(cantidad, bool) or cantidad <= 0 or precio_compra is None or not precio_compra.is_finite() or precio_compra < 0:
+            return jsonify({'message': 'Detalle de compra inválido', 'detalle': detalle}), 400
+        cantidades[codigo_barras] = cantidades.get(codigo_barras, 0) + cantidad
+        lineas.append({
+            'folio_compra': folio_compra,
+            'codigo_barras': codigo_barras,
+            'cantidad': cantidad,
+            'precio_compra': precio_compra,
+        })
+
+    existentes = {
+        codigo for codigo, in
+        Producto.query
+        .with_entities(Producto.codigo_barras)
+        .filter(Producto.codigo_barras.in_(cantidades))
+    }
+    no_encontrados = [codigo for codigo in cantidades if codigo not in existentes]
+    if no_encontrados:
+        return jsonify({'message': 'Producto no encontrado', 'codigos_barras': no_encontrados}), 404
+
+    # Un folio ya registrado es un reintento y se rechaza para no reabastecer dos
+    # veces; las líneas solo se agregan a él con entrega_parcial=true
+    compra = Compra.query.get(folio_compra)
+    nueva = compra is None
+    if nueva:
+        compra = Compra(folio_compra, folio_sesion, rfc_proveedor, fecha_compra, 0)
+        db.session.add(compra)
+    elif not entrega_parcial:
+        return jsonify({'message': 'La compra ya existe; envíe entrega_parcial=true para agregarle otra entrega'}), 409
+    elif compra.rfc_proveedor != rfc_proveedor or compra.folio_sesion != folio_sesion:
+        return jsonify({'message': 'El folio ya existe con otro proveedor o sesión',
+                        'rfc_proveedor': compra.rfc_proveedor, 'folio_sesion': compra.folio_sesion}), 409
+
+    try:
+        db.session.flush()
+        db.session.execute(DetalleCompra.__table__.insert(), lineas)
+
+        # Un solo UPDATE suma las cantidades recibidas a todos los productos
+        incremento = case(cantidades, value=Producto.codigo_barras)
+        db.session.execute(
+            Producto.__table__.update()
+            .where(Producto.codigo_barras.in_(cantidades))
+            .values(cantidad_actual=Producto.cantidad_actual + incremento)
+        )
+        registrar_movimientos(COMPRA, cantidades, folio_compra)
+
+        # El total se recalcula con todas las líneas de la compra en el mismo
+        # UPDATE: la subconsulta ve las de otra entrega simultánea del folio y no
+        # pasa por la verificación de versión del ORM, que daría StaleDataError
+        total = (
+            db.select(func.coalesce(func.sum(DetalleCompra.cantidad * DetalleCompra.precio_compra), 0))
+            .where(DetalleCompra.folio_compra == folio_compra)
+            .scalar_subquery()
+        )
+        valores = {'total_compra': total}
+        if not nueva:
+            valores['version'] = Compra.version + 1
+        db.session.execute(
+            Compra.__table__.update()
+            .where(Compra.folio_compra == folio_compra)
+            .values(**valores)
+        )
+        confirmar(partial(indice_productos.invalidar, *cantidades))
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'La compra ya existe o hace referencia a datos inexistentes'}), 409
+
+    respuesta = compra_schema.dump(compra)
+    respuesta['detalles'] = detalles_compra_schema.dump(lineas)
+    return jsonify(respuesta), 201
+
 # PUT actualizar compra
-@app.route('/compra/actualizar_compra/<string:folio_compra>', methods=['PUT'])
+@bp.route('/compra/actualizar_compra/<string:folio_compra>', methods=['PUT'])
 def actualizarCompra(folio_compra):
     actualizar_compra = Compra.query.get(folio_compra)
     if actualizar_compra is None:
         return jsonify({'message': 'Compra no encontrada'}), 404
+    error = verificar_if_match(actualizar_compra.version)
+    if error is not None:
+        return error
 
     datosJSON = request.get_json(force=True)
     actualizar_compra.folio_sesion = datosJSON.get('folio_sesion', actualizar_compra.folio_sesion)
@@ -153,11 +232,16 @@ def actualizarCompra(folio_compra):
     actualizar_compra.fecha_compra = datetime.strptime(datosJSON.get('fecha_compra'), '%Y-%m-%d').date()
     actualizar_compra.total_compra = datosJSON.get('total_compra', actualizar_compra.total_compra)
 
-    db.session.commit()
-    return compra_schema.jsonify(actualizar_compra)
+    # Otra petición escribió entre la lectura y el UPDATE
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return conflicto_version(db.session.query(Compra.version).filter_by(folio_compra=folio_compra).scalar())
+    return con_version(compra_schema.jsonify(actualizar_compra), actualizar_compra.version)
 
 # DELETE eliminar compra
-@app.route('/compra/eliminar_compra/<string:folio_compra>', methods=['DELETE'])
+@bp.route('/compra/eliminar_compra/<string:folio_compra>', methods=['DELETE'])
 def eliminarCompra(folio_compra):
     eliminar_compra = Compra.query.get(folio_compra)
     if eliminar_compra is None:
@@ -166,7 +250,3 @@ def eliminarCompra(folio_compra):
     db.session.delete(eliminar_compra)
     db.session.commit()
     return compra_schema.jsonify(eliminar_compra)
-
-if __name__ == "__main__":
-    app.run(debug=True, port=4040, host="localhost")
-
@@ -0,0 +1,71 @@
+import gzip
+
+from flask import current_app, request
+
+# brotli es opcional: sin él solo se negocia gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bytes mínimos para comprimir una respuesta y nivel de compresión; se pueden
+# sobreescribir en la configuración con COMPRESION_MINIMO, COMPRESION_NIVEL_GZIP
+# y COMPRESION_NIVEL_BROTLI. COMPRIMIR_RESPUESTAS=False lo desactiva (por ejemplo
+# si un proxy ya comprime).
+COMPRESION_MINIMO = 1024
+COMPRESION_NIVEL_GZIP = 6
+COMPRESION_NIVEL_BROTLI = 4
+
+TIPOS_COMPRIMIBLES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'}
+
+
+def codificacion_aceptada():
+    """Codificación que se usará según Accept-Encoding; br tiene preferencia si está disponible."""
+    aceptadas = request.accept_encodings
+    if brotli is not None and aceptadas['br']:
+        return 'br'
+    if aceptadas['gzip']:
+        return 'gzip'
+    return None
+
+
+def comprimir(respuesta):
+    """Comprime el cuerpo de la respuesta si el cliente lo acepta y supera el tamaño mínimo.
+
+    Las respuestas en streaming (exportaciones) se dejan sin tocar para no
+    acumularlas en memoria.
+    """
+    if not current_app.config.get('COMPRIMIR_RESPUESTAS', True):
+        return respuesta
+    if (respuesta.status_code < 200 or respuesta.status_code >= 300 or respuesta.status_code == 206
+            or respuesta.direct_passthrough or respuesta.is_streamed
+            or 'Content-Encoding' in respuesta.headers
+            or respuesta.mimetype not in TIPOS_COMPRIMIBLES):
+        return respuesta
+
+    respuesta.vary.add('Accept-Encoding')
+    minimo = current_app.config.get('COMPRESION_MINIMO', COMPRESION_MINIMO)
+    if respuesta.calculate_content_length() < minimo:
+        return respuesta
+    codificacion = codificacion_aceptada()
+    if codificacion is None:
+        return respuesta
+
+    datos = respuesta.get_data()
+    if codificacion == 'br':
+        datos = brotli.compress(datos, quality=current_app.config.get('COMPRESION_NIVEL_BROTLI', COMPRESION_NIVEL_BROTLI))
+    else:
+        datos = gzip.compress(datos, compresslevel=current_app.config.get('COMPRESION_NIVEL_GZIP', COMPRESION_NIVEL_GZIP))
+    respuesta.set_data(datos)
+    respuesta.headers['Content-Encoding'] = codificacion
+
+    # El cuerpo ya no es idéntico byte a byte al original: la ETag pasa a débil,
+    # que sigue validando If-None-Match
+    etag, debil = respuesta.get_etag()
+    if etag and not debil:
+        respuesta.set_etag(etag, weak=True)
+    return respuesta
+
+
+def init_app(app):
+    app.after_request(comprimir)
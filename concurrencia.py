@@ -0,0 +1,29 @@
+from flask import jsonify, request
+
+
+def con_version(respuesta, version):
+    """Pone la versión del registro como ETag de la respuesta."""
+    respuesta.set_etag('v%d' % version)
+    return respuesta
+
+
+def verificar_if_match(version):
+    """Compara If-Match con la versión actual del registro antes de una escritura.
+
+    Devuelve la respuesta de error (428 si falta el encabezado, 412 si la versión
+    ya cambió) o None si se puede escribir. La ETag identifica la versión y no
+    los bytes del cuerpo, así que también se acepta su forma débil (W/"v3") que
+    queda cuando la respuesta se comprime.
+    """
+    if not request.if_match:
+        return jsonify({'message': 'Se requiere el encabezado If-Match con el ETag del registro'}), 428
+    if request.if_match.star_tag or request.if_match.contains_weak('v%d' % version):
+        return None
+    return conflicto_version(version)
+
+
+def conflicto_version(version):
+    """412 con la versión vigente para que el cliente vuelva a leer el registro."""
+    respuesta = jsonify({'message': 'El registro fue modificado por otra petición', 'version': version})
+    respuesta.status_code = 412
+    return con_version(respuesta, version)
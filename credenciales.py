@@ -0,0 +1,120 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+from cache import CacheTTL
+
+# Algoritmo de werkzeug para las contraseñas nuevas ('scrypt' o 'pbkdf2'); se
+# puede sobreescribir en la configuración con METODO_HASH_CONTRASENIA.
+METODO_HASH_CONTRASENIA = 'scrypt'
+
+# Hilos que calculan hashes al mismo tiempo en cada worker; acota el CPU que
+# puede tomar una ola de inicios de sesión. Se reparten los núcleos del equipo
+# entre los workers de gunicorn (POS_WORKERS, por omisión núcleos + 1), así que
+# el total de hashes simultáneos no pasa de un hilo por worker o por núcleo. Se
+# puede sobreescribir en la configuración con HILOS_HASH_CONTRASENIA.
+_nucleos = os.cpu_count() or 2
+HILOS_HASH_CONTRASENIA = max(1, _nucleos // int(os.environ.get('POS_WORKERS', _nucleos + 1)))
+
+# Segundos que una credencial ya verificada se acepta sin volver a calcular el
+# hash, mientras el valor guardado en la base no cambie; se puede sobreescribir
+# en la configuración con CACHE_CREDENCIALES_TTL.
+CACHE_CREDENCIALES_TTL = 900
+CACHE_CREDENCIALES_MAXIMO = 10000
+
+METODOS_HASH = ('scrypt', 'pbkdf2')
+
+# Llaves del caché: HMAC de usuario y contraseña con una clave aleatoria del
+# proceso, para no guardar contraseñas en claro ni hashes reutilizables
+_clave_cache = secrets.token_bytes(32)
+credenciales_verificadas = CacheTTL(CACHE_CREDENCIALES_MAXIMO)
+
+_ejecutor = None
+_candado_ejecutor = threading.Lock()
+_hash_ficticio = None
+
+
+def _metodo():
+    return current_app.config.get('METODO_HASH_CONTRASENIA', METODO_HASH_CONTRASENIA)
+
+
+def _obtener_ejecutor():
+    # Se crea en la primera verificación para que cada worker de gunicorn tenga el suyo
+    global _ejecutor
+    with _candado_ejecutor:
+        if _ejecutor is None:
+            hilos = current_app.config.get('HILOS_HASH_CONTRASENIA', HILOS_HASH_CONTRASENIA)
+            _ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='hash_contrasenia')
+        return _ejecutor
+
+
+def es_hash(valor):
+    """True si el valor guardado ya es un hash de werkzeug y no una contraseña en claro."""
+    return valor.count('$') == 2 and valor.split(':', 1)[0] in METODOS_HASH
+
+
+def cifrar(contrasenia):
+    """Calcula el hash de una contraseña nueva en el pool de hilos de hash."""
+    return _obtener_ejecutor().submit(generate_password_hash, contrasenia, method=_metodo()).result()
+
+
+def _verificar(guardado, contrasenia):
+    if es_hash(guardado):
+        return check_password_hash(guardado, contrasenia)
+    # Contraseña heredada en claro: comparación en tiempo constante
+    return hmac.compare_digest(guardado.encode(), contrasenia.encode())
+
+
+def verificar(guardado, contrasenia):
+    """Compara la contraseña con el valor guardado en el pool de hilos de hash.
+
+    Si ``guardado`` es None (usuario inexistente) se verifica contra un hash
+    ficticio para que la respuesta tarde lo mismo y no revele qué usuarios existen.
+    """
+    global _hash_ficticio
+    if guardado is None:
+        if _hash_ficticio is None:
+            _hash_ficticio = cifrar(secrets.token_hex(16))
+        _obtener_ejecutor().submit(_verificar, _hash_ficticio, contrasenia).result()
+        return False
+    return _obtener_ejecutor().submit(_verificar, guardado, contrasenia).result()
+
+
+def requiere_rehash(guardado):
+    """True si el valor está en claro o cifrado con un método distinto al configurado."""
+    return not es_hash(guardado) or not guardado.startswith(_metodo() + ':')
+
+
+def _llave(clv_usuario, contrasenia):
+    firma = hmac.new(_clave_cache, contrasenia.encode(), hashlib.sha256).digest()
+    return clv_usuario, firma
+
+
+def verificado_en_cache(clv_usuario, contrasenia, guardado):
+    """True si la contraseña ya se verificó hace poco contra el mismo valor ``guardado``.
+
+    La entrada del caché lleva el hash con el que se verificó; si otro worker
+    cambió la contraseña o eliminó al usuario, el valor leído de la base ya no
+    coincide y hay que verificar de nuevo.
+    """
+    verificado = credenciales_verificadas.obtener(_llave(clv_usuario, contrasenia))
+    return verificado is not None and guardado is not None and hmac.compare_digest(verificado, guardado)
+
+
+def guardar_verificado(clv_usuario, contrasenia, guardado):
+    ttl = current_app.config.get('CACHE_CREDENCIALES_TTL', CACHE_CREDENCIALES_TTL)
+    credenciales_verificadas.guardar(_llave(clv_usuario, contrasenia), guardado, ttl)
+
+
+def invalidar(clv_usuario):
+    """Descarta en este worker las credenciales verificadas de un usuario tras modificarlo o eliminarlo.
+
+    Solo libera memoria: los demás workers detectan el cambio al comparar con el
+    valor de la base en verificado_en_cache().
+    """
+    credenciales_verificadas.invalidar(lambda llave: llave[0] == clv_usuario)
@@ -0,0 +1,54 @@
+from flask import Response, current_app, jsonify, request, stream_with_context
+from serializacion import serializador
+
+# Registros que se traen de la base en cada viaje del cursor; se puede
+# sobreescribir en la configuración con TAMANIO_LOTE_EXPORTACION.
+TAMANIO_LOTE_EXPORTACION = 1000
+
+FORMATOS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+
+def exportar(consulta, llave, esquema):
+    """Exporta una tabla completa como NDJSON (por defecto) o arreglo JSON, en streaming.
+
+    Las filas se leen con un cursor del servidor en lotes, se serializan una a una
+    y cada lote se envía al socket antes de leer el siguiente, así que la memoria
+    usada no depende del tamaño de la tabla.
+    """
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in FORMATOS:
+        return jsonify({'message': 'Formato no soportado', 'formatos': list(FORMATOS)}), 400
+
+    tamanio = current_app.config.get('TAMANIO_LOTE_EXPORTACION', TAMANIO_LOTE_EXPORTACION)
+    compilado = serializador(esquema, llave)
+    if compilado is not None:
+        # Tuplas de columnas en lugar de instancias del ORM
+        columnas, convertir = compilado
+        filas = consulta.with_entities(*columnas).order_by(llave).yield_per(tamanio)
+    else:
+        filas = consulta.order_by(llave).yield_per(tamanio)
+        convertir = esquema.dump
+    serializar = current_app.json.dumps
+
+    def generar():
+        if formato == 'json':
+            yield '['
+        lote = []
+        for numero, fila in enumerate(filas):
+            texto = serializar(convertir(fila))
+            if formato == 'ndjson':
+                lote.append(texto + '\n')
+            else:
+                lote.append(texto if numero == 0 else ',' + texto)
+            if len(lote) >= tamanio:
+                yield ''.join(lote)
+                lote = []
+        if lote:
+            yield ''.join(lote)
+        if formato == 'json':
+            yield ']'
+
+    return Response(stream_with_context(generar()), mimetype=FORMATOS[formato])
@@ -0,0 +1,8 @@
+from flask_sqlalchemy import SQLAlchemy
+from flask_marshmallow import Marshmallow
+from flask_cors import CORS
+
+# Extensiones compartidas por todos los blueprints; se enlazan a la aplicación en create_app()
+db = SQLAlchemy()
+ma = Marshmallow()
+cors = CORS()
@@ -0,0 +1,36 @@
+# Configuración de gunicorn para servir la API en producción:
+#
+#     gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Cada valor se puede ajustar por sucursal con variables de entorno. Para recargar
+# el código sin cortar peticiones en curso se envía SIGHUP al proceso maestro
+# (kill -HUP <pid>): los workers viejos terminan lo que atienden antes de salir.
+import multiprocessing
+import os
+
+bind = os.environ.get('POS_BIND', '0.0.0.0:4040')
+
+# Workers con hilos: las peticiones pasan la mayor parte del tiempo esperando a la
+# base de datos, así que unos pocos procesos con varios hilos rinden más que muchos
+# procesos de un hilo y mantienen bajo el número de conexiones abiertas.
+worker_class = 'gthread'
+workers = int(os.environ.get('POS_WORKERS', multiprocessing.cpu_count() + 1))
+threads = int(os.environ.get('POS_THREADS', 4))
+
+# Cada hilo usa como máximo una conexión: POOL_SIZE en config debe ser >= threads.
+# Conexiones totales a la base = workers * (POOL_SIZE + POOL_MAX_OVERFLOW).
+
+keepalive = int(os.environ.get('POS_KEEPALIVE', 5))
+timeout = int(os.environ.get('POS_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('POS_GRACEFUL_TIMEOUT', 30))
+
+# Reciclar workers periódicamente acota el crecimiento de memoria
+max_requests = int(os.environ.get('POS_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('POS_MAX_REQUESTS_JITTER', 500))
+
+# Cada worker crea su propia aplicación y su propio pool después del fork
+preload_app = False
+
+accesslog = os.environ.get('POS_ACCESSLOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('POS_LOGLEVEL', 'info')
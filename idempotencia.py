@@ -0,0 +1,178 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, current_app, g, jsonify, make_response, request
+from sqlalchemy import inspect, tuple_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from extensiones import db
+from modelos import RespuestaIdempotente
+from tareas_periodicas import TareaPeriodica
+
+# Segundos que se guarda la respuesta de una petición con Idempotency-Key; se
+# puede sobreescribir en la configuración con IDEMPOTENCIA_TTL.
+IDEMPOTENCIA_TTL = 24 * 60 * 60
+
+# Respuestas vencidas que se borran por sentencia y segundos entre purgas del
+# hilo en segundo plano; se pueden sobreescribir en la configuración con
+# TAMANIO_LOTE_PURGA y PURGA_IDEMPOTENCIA_INTERVALO. El hilo arranca en cada
+# worker con la primera petición que trae Idempotency-Key (crear la aplicación
+# no abre conexiones); con PURGA_IDEMPOTENCIA=False no arranca y la purga corre
+# desde cron con `flask --app app purgar_idempotencia`.
+TAMANIO_LOTE_PURGA = 500
+PURGA_IDEMPOTENCIA_INTERVALO = 60 * 60
+
+ENCABEZADOS_GUARDADOS = ('Content-Type', 'ETag', 'Location')
+
+
+def _repetir(guardado, huella):
+    """Respuesta para una petición cuya llave ya está registrada."""
+    if guardado is None or guardado.estado is None:
+        respuesta = jsonify({'message': 'Una petición con la misma Idempotency-Key sigue en proceso'})
+        respuesta.status_code = 409
+        respuesta.headers['Retry-After'] = '1'
+        return respuesta
+    if guardado.huella != huella:
+        return jsonify({'message': 'La Idempotency-Key ya se usó con otro cuerpo'}), 422
+    respuesta = Response(guardado.cuerpo, status=guardado.estado, headers=json.loads(guardado.encabezados))
+    respuesta.headers['Idempotent-Replayed'] = 'true'
+    return respuesta
+
+
+def confirmar(al_confirmar=None):
+    """Commit de una ruta decorada con @idempotente; ``al_confirmar`` se ejecuta después del commit.
+
+    Con Idempotency-Key solo hace flush y expira los objetos, como el commit: el
+    decorador guarda la respuesta y confirma todo con un único commit, y después
+    ejecuta ``al_confirmar`` (por ejemplo invalidar cachés). Sin el encabezado
+    hace commit de inmediato.
+    """
+    diferida = g.get('idempotencia')
+    if diferida is None:
+        db.session.commit()
+        if al_confirmar is not None:
+            al_confirmar()
+        return
+    db.session.flush()
+    db.session.expire_all()
+    diferida['confirmada'] = True
+    if al_confirmar is not None:
+        diferida['al_confirmar'].append(al_confirmar)
+
+
+def idempotente(vista):
+    """Repite la respuesta original cuando un POST llega otra vez con el mismo Idempotency-Key.
+
+    Un reintento cuesta una lectura por llave primaria: recibe la respuesta
+    guardada, 422 si el cuerpo es otro o 409 mientras la original no termina.
+    Una llave nueva se inserta en respuesta_idempotente antes de ejecutar la ruta
+    y la ruta confirma con confirmar(), así que la llave, la escritura y la
+    respuesta guardada entran en un solo commit y dos peticiones simultáneas en
+    distintos workers chocan en la llave primaria. Si la ruta no confirma nada
+    (validación, existencias insuficientes, error) la llave no queda registrada
+    y el reintento se ejecuta. Sin el encabezado la ruta se comporta como siempre.
+    """
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        clave = request.headers.get('Idempotency-Key')
+        if not clave:
+            return vista(*args, **kwargs)
+        if len(clave) > 255:
+            return jsonify({'message': 'Idempotency-Key admite como máximo 255 caracteres'}), 400
+
+        if current_app.config.get('PURGA_IDEMPOTENCIA', True):
+            purgador_idempotencia.iniciar(current_app._get_current_object())
+
+        huella = hashlib.sha256(request.get_data()).hexdigest()
+        llave = (request.endpoint, clave)
+        ttl = current_app.config.get('IDEMPOTENCIA_TTL', IDEMPOTENCIA_TTL)
+        guardado = db.session.get(RespuestaIdempotente, llave)
+        if guardado is not None:
+            # Solo una respuesta completa y vencida (que la purga no ha borrado)
+            # libera la llave; una en curso se respeta siempre
+            if guardado.estado is None or guardado.expira >= datetime.now():
+                return _repetir(guardado, huella)
+            db.session.delete(guardado)
+            db.session.flush()
+
+        registro = RespuestaIdempotente(request.endpoint, clave, huella, datetime.now() + timedelta(seconds=ttl))
+        db.session.add(registro)
+        try:
+            # Si otra petición con la misma llave sigue abierta, el INSERT espera
+            # a que termine y falla solo si ella confirmó
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return _repetir(db.session.get(RespuestaIdempotente, llave), huella)
+
+        g.idempotencia = diferida = {'confirmada': False, 'al_confirmar': []}
+        try:
+            respuesta = make_response(vista(*args, **kwargs))
+        except BaseException:
+            db.session.rollback()
+            raise
+        finally:
+            g.pop('idempotencia', None)
+        if not diferida['confirmada']:
+            # La ruta no escribió nada: la llave tampoco queda registrada
+            db.session.rollback()
+            return respuesta
+
+        # Si la ruta hizo rollback antes de confirmar, la llave se inserta de nuevo
+        if inspect(registro).transient:
+            db.session.add(registro)
+        registro.estado = respuesta.status_code
+        registro.cuerpo = respuesta.get_data()
+        registro.encabezados = json.dumps(
+            {nombre: respuesta.headers[nombre] for nombre in ENCABEZADOS_GUARDADOS if nombre in respuesta.headers})
+        registro.expira = datetime.now() + timedelta(seconds=ttl)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Otra petición con la misma llave confirmó mientras esta volvía a insertarla
+            db.session.rollback()
+            return _repetir(db.session.get(RespuestaIdempotente, llave), huella)
+        except SQLAlchemyError:
+            # Ni la escritura ni la llave quedaron confirmadas: el reintento se ejecuta
+            db.session.rollback()
+            raise
+        for funcion in diferida['al_confirmar']:
+            funcion()
+        return respuesta
+    return envoltura
+
+
+def purgar(tamanio=TAMANIO_LOTE_PURGA):
+    """Borra por lotes las respuestas vencidas; devuelve cuántas borró."""
+    ahora = datetime.now()
+    tabla = RespuestaIdempotente.__table__
+    total = 0
+    while True:
+        llaves = db.session.execute(
+            db.select(tabla.c.endpoint, tabla.c.clave)
+            .where(tabla.c.expira < ahora)
+            .order_by(tabla.c.expira)
+            .limit(tamanio)
+        ).all()
+        if not llaves:
+            return total
+        resultado = db.session.execute(
+            tabla.delete()
+            .where(tuple_(tabla.c.endpoint, tabla.c.clave).in_(llaves))
+            .where(tabla.c.expira < ahora)
+        )
+        db.session.commit()
+        total += resultado.rowcount
+        if len(llaves) < tamanio:
+            return total
+
+
+def _purgar_periodicamente(app):
+    purgar(app.config.get('TAMANIO_LOTE_PURGA', TAMANIO_LOTE_PURGA))
+
+
+# Purga periódica de este worker; la primera espera un intervalo
+purgador_idempotencia = TareaPeriodica(
+    'purga_idempotencia', _purgar_periodicamente, 'PURGA_IDEMPOTENCIA_INTERVALO',
+    PURGA_IDEMPOTENCIA_INTERVALO, 'la purga de respuestas idempotentes', inmediata=False)
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+import time
+
+from flask import current_app, request
+from marshmallow import EXCLUDE, ValidationError
+from sqlalchemy.exc import IntegrityError
+from extensiones import db
+
+# Registros por INSERT/commit y máximo de errores detallados en el resumen; se
+# pueden sobreescribir en la configuración con TAMANIO_LOTE_IMPORTACION y
+# MAXIMO_ERRORES_IMPORTACION.
+TAMANIO_LOTE_IMPORTACION = 1000
+MAXIMO_ERRORES_IMPORTACION = 100
+
+FORMATOS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+}
+
+
+def formato_solicitado():
+    """Formato del cuerpo según ?formato= o el Content-Type; None si no es soportado."""
+    formato = request.args.get('formato') or FORMATOS.get(request.mimetype)
+    return formato if formato in FORMATOS.values() else None
+
+
+def leer_registros(flujo, formato):
+    """Genera (número de fila, registro o error) leyendo el cuerpo de la petición de forma incremental."""
+    texto = io.TextIOWrapper(io.BufferedReader(flujo), encoding='utf-8-sig', newline='')
+    if formato == 'csv':
+        for numero, registro in enumerate(csv.DictReader(texto), 1):
+            yield numero, registro
+        return
+    for numero, linea in enumerate(texto, 1):
+        if not linea.strip():
+            continue
+        try:
+            yield numero, json.loads(linea)
+        except json.JSONDecodeError as error:
+            yield numero, error
+
+
+def importar(modelo, esquema, flujo, formato):
+    """Valida cada registro con el esquema e inserta los válidos por lotes; devuelve el resumen del trabajo.
+
+    Solo se mantiene en memoria el lote en curso, así que el consumo no depende del
+    tamaño del archivo. Si un lote choca con registros existentes se reintenta fila
+    por fila para reportar exactamente cuáles fallaron.
+    """
+    tamanio = current_app.config.get('TAMANIO_LOTE_IMPORTACION', TAMANIO_LOTE_IMPORTACION)
+    maximo_errores = current_app.config.get('MAXIMO_ERRORES_IMPORTACION', MAXIMO_ERRORES_IMPORTACION)
+    resumen = {'leidos': 0, 'insertados': 0, 'rechazados': 0, 'errores': []}
+    inicio = time.perf_counter()
+
+    def rechazar(numero, errores):
+        resumen['rechazados'] += 1
+        if len(resumen['errores']) < maximo_errores:
+            resumen['errores'].append({'fila': numero, 'errores': errores})
+
+    def guardar(lote):
+        try:
+            db.session.execute(modelo.__table__.insert(), [registro for _, registro in lote])
+            db.session.commit()
+            resumen['insertados'] += len(lote)
+        except IntegrityError:
+            db.session.rollback()
+            for numero, registro in lote:
+                try:
+                    db.session.execute(modelo.__table__.insert(), registro)
+                    db.session.commit()
+                    resumen['insertados'] += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    rechazar(numero, {'registro': 'Llave repetida o referencia inexistente'})
+
+    lote = []
+    try:
+        for numero, registro in leer_registros(flujo, formato):
+            resumen['leidos'] += 1
+            if isinstance(registro, Exception) or not isinstance(registro, dict):
+                rechazar(numero, {'registro': 'Línea con formato inválido'})
+                continue
+            try:
+                lote.append((numero, esquema.load(registro, unknown=EXCLUDE)))
+            except ValidationError as error:
+                rechazar(numero, error.messages)
+                continue
+            if len(lote) >= tamanio:
+                guardar(lote)
+                lote = []
+    except (csv.Error, UnicodeDecodeError) as error:
+        resumen['error_lectura'] = str(error)
+    if lote:
+        guardar(lote)
+
+    resumen['duracion_s'] = round(time.perf_counter() - inicio, 3)
+    return resumen
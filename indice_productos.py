@@ -0,0 +1,106 @@
+import threading
+
+from flask import current_app
+from cache import CacheTTL
+from modelos import Producto
+
+# Segundos que un producto permanece en el índice antes de releerse de la base;
+# acota cuánto tarda un worker en ver cambios hechos por otro. Se puede
+# sobreescribir en la configuración con INDICE_PRODUCTOS_TTL.
+INDICE_PRODUCTOS_TTL = 60
+INDICE_PRODUCTOS_MAXIMO = 200000
+
+# Códigos por consulta IN al resolver lotes, para no exceder límites del servidor
+TAMANIO_LOTE_IN = 500
+
+# Campos de un producto en las respuestas; ProductoSchema los toma de aquí para
+# que el índice y las rutas CRUD devuelvan lo mismo. La versión no va en el
+# cuerpo: sale en el ETag.
+CAMPOS_PRODUCTO = ('codigo_barras', 'nombre', 'descripcion', 'id_categoria', 'id_presentacion', 'id_marca',
+                   'cantidad_actual', 'cantidad_maxima', 'cantidad_minima', 'precio', 'estado')
+
+
+def serializar(producto):
+    """Entrada del índice: los campos del producto y, por separado, su versión."""
+    return {campo: getattr(producto, campo) for campo in CAMPOS_PRODUCTO}, producto.version
+
+
+class IndiceProductos:
+    """Índice en memoria de productos por código de barras para las lecturas del escáner."""
+
+    def __init__(self, maximo=INDICE_PRODUCTOS_MAXIMO):
+        self._productos = CacheTTL(maximo)
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _ttl(self):
+        return current_app.config.get('INDICE_PRODUCTOS_TTL', INDICE_PRODUCTOS_TTL)
+
+    def cargar(self):
+        """Precarga todo el catálogo; se usa al arrancar si PRECARGAR_INDICE_PRODUCTOS está activo."""
+        ttl = self._ttl()
+        total = 0
+        for producto in Producto.query.yield_per(1000):
+            self._productos.guardar(producto.codigo_barras, serializar(producto), ttl)
+            total += 1
+        return total
+
+    def obtener(self, codigo_barras):
+        """(producto, versión) del código de barras, o None si no existe."""
+        producto = self._productos.obtener(codigo_barras)
+        with self._candado:
+            if producto is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+        if producto is not None:
+            return producto
+
+        un_producto = Producto.query.filter_by(codigo_barras=codigo_barras).first()
+        if un_producto is None:
+            return None
+        producto = serializar(un_producto)
+        self._productos.guardar(codigo_barras, producto, self._ttl())
+        return producto
+
+    def obtener_varios(self, codigos_barras):
+        """Resuelve muchos códigos a la vez (código -> producto): los que no están en memoria se leen con consultas IN por lotes."""
+        encontrados = {}
+        pendientes = []
+        for codigo_barras in codigos_barras:
+            producto = self._productos.obtener(codigo_barras)
+            if producto is None:
+                pendientes.append(codigo_barras)
+            else:
+                encontrados[codigo_barras] = producto[0]
+        with self._candado:
+            self.aciertos += len(encontrados)
+            self.fallos += len(pendientes)
+
+        ttl = self._ttl()
+        for inicio in range(0, len(pendientes), TAMANIO_LOTE_IN):
+            lote = pendientes[inicio:inicio + TAMANIO_LOTE_IN]
+            for un_producto in Producto.query.filter(Producto.codigo_barras.in_(lote)):
+                producto = serializar(un_producto)
+                self._productos.guardar(un_producto.codigo_barras, producto, ttl)
+                encontrados[un_producto.codigo_barras] = producto[0]
+        return encontrados
+
+    def invalidar(self, *codigos_barras):
+        for codigo_barras in codigos_barras:
+            self._productos.eliminar(codigo_barras)
+
+    def estadisticas(self):
+        with self._candado:
+            aciertos, fallos = self.aciertos, self.fallos
+        consultas = aciertos + fallos
+        return {
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'tasa_aciertos': aciertos / consultas if consultas else None,
+            'productos': len(self._productos),
+        }
+
+
+indice_productos = IndiceProductos()
@@ -0,0 +1,48 @@
+from flask import current_app
+from extensiones import db
+
+# Filas por sentencia en las inserciones masivas; se puede sobreescribir en la
+# configuración con TAMANIO_LOTE_INSERCION.
+TAMANIO_LOTE_INSERCION = 1000
+
+
+def lotes(filas, tamanio=TAMANIO_LOTE_INSERCION):
+    for inicio in range(0, len(filas), tamanio):
+        yield filas[inicio:inicio + tamanio]
+
+
+def insertar_o_actualizar(tabla, filas, llaves, actualizar=(), incrementar=()):
+    """Inserta filas y, si la llave ya existe, actualiza la fila existente, con el upsert nativo del dialecto.
+
+    Las columnas de ``actualizar`` toman el valor nuevo y las de ``incrementar`` se
+    suman al valor guardado. Usa ``INSERT ... ON DUPLICATE KEY UPDATE`` en MySQL e
+    ``INSERT ... ON CONFLICT DO UPDATE`` en PostgreSQL y SQLite; no hace commit.
+    """
+    if not filas:
+        return
+    dialecto = db.session.get_bind().dialect.name
+    if dialecto == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        sentencia = insert(tabla)
+        nuevos = sentencia.inserted
+    elif dialecto in ('postgresql', 'sqlite'):
+        if dialecto == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        sentencia = insert(tabla)
+        nuevos = sentencia.excluded
+    else:
+        raise NotImplementedError('Upsert no soportado para el dialecto %s' % dialecto)
+
+    valores = {columna: nuevos[columna] for columna in actualizar}
+    valores.update({columna: tabla.c[columna] + nuevos[columna] for columna in incrementar})
+
+    if dialecto == 'mysql':
+        sentencia = sentencia.on_duplicate_key_update(valores)
+    else:
+        sentencia = sentencia.on_conflict_do_update(index_elements=list(llaves), set_=valores)
+
+    tamanio = current_app.config.get('TAMANIO_LOTE_INSERCION', TAMANIO_LOTE_INSERCION)
+    for lote in lotes(filas, tamanio):
+        db.session.execute(sentencia, lote)
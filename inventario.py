@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from extensiones import db
+from modelos import MovimientoInventario, Producto
+
+# Tipos de movimiento del historial de inventario
+APERTURA = 'apertura'
+VENTA = 'venta'
+COMPRA = 'compra'
+AJUSTE = 'ajuste'
+CONCILIACION = 'conciliacion'
+
+
+def registrar_movimientos(tipo, cantidades, referencia=None):
+    """Agrega al historial un movimiento por producto; las cantidades negativas son salidas.
+
+    Se llama en la misma transacción que modifica cantidad_actual y no hace commit.
+    """
+    fecha_hora = datetime.now()
+    movimientos = [
+        {'codigo_barras': codigo_barras, 'tipo': tipo, 'cantidad': cantidad,
+         'referencia': referencia, 'fecha_hora': fecha_hora}
+        for codigo_barras, cantidad in sorted(cantidades.items())
+        if cantidad
+    ]
+    if movimientos:
+        db.session.execute(MovimientoInventario.__table__.insert(), movimientos)
+
+
+def ajustar_existencia(codigo_barras, cantidad, tipo=AJUSTE, referencia=None):
+    """Suma ``cantidad`` a la existencia con un UPDATE atómico y la registra en el historial.
+
+    El UPDATE no deja la existencia bajo cero; devuelve False si el producto no
+    existe o no alcanza. No hace commit.
+    """
+    resultado = db.session.execute(
+        Producto.__table__.update()
+        .where(Producto.codigo_barras == codigo_barras)
+        .where(Producto.cantidad_actual + cantidad >= 0)
+        .values(cantidad_actual=Producto.cantidad_actual + cantidad)
+    )
+    if resultado.rowcount != 1:
+        return False
+    registrar_movimientos(tipo, {codigo_barras: cantidad}, referencia)
+    return True
+
+
+def mover_linea(tipo, signo, anterior=None, nueva=None):
+    """Ajusta la existencia al agregar, cambiar o quitar una línea de venta o compra.
+
+    ``anterior`` y ``nueva`` son (codigo_barras, cantidad, referencia) de la
+    línea antes y después de la escritura, o None si no existía o se elimina;
+    ``signo`` es -1 para líneas de venta (salidas) y 1 para las de compra. La
+    línea anterior se revierte y la nueva se aplica con ajustar_existencia, así
+    que el historial registra las compensaciones. Devuelve el código de barras
+    que no alcanzó existencia (o no existe), o None. No hace commit.
+    """
+    cambios = {}
+    for linea, factor in ((anterior, -signo), (nueva, signo)):
+        if linea is not None:
+            codigo_barras, cantidad, referencia = linea
+            cambios[codigo_barras, referencia] = cambios.get((codigo_barras, referencia), 0) + factor * cantidad
+    # Orden fijo para que dos escrituras simultáneas bloqueen los productos en el mismo orden
+    for (codigo_barras, referencia), cantidad in sorted(cambios.items(), key=lambda cambio: (cambio[0][0], str(cambio[0][1]))):
+        if cantidad and not ajustar_existencia(codigo_barras, cantidad, tipo, referencia):
+            return codigo_barras
+    return None
@@ -0,0 +1,19 @@
+-- Tipos de columna unificados al declarar los modelos una sola vez en modelos.py (MySQL).
+-- Las copias de los modelos en cada módulo no coincidían, así que una base
+-- existente tiene los tipos del módulo que creó cada tabla: precio y
+-- total_compra pudieron quedar como FLOAT y folio_compra como VARCHAR(18).
+-- `flask --app app crear_esquema` no modifica tablas existentes; este script
+-- las lleva a los tipos de modelos.py y se puede ejecutar aunque ya los tengan.
+-- Hay que ejecutarlo antes que los demás scripts de migraciones/.
+
+-- Importes exactos: FLOAT redondeaba los centavos
+ALTER TABLE producto MODIFY precio NUMERIC(10, 2) NOT NULL;
+ALTER TABLE compra MODIFY total_compra NUMERIC(10, 2) NOT NULL;
+
+-- folio_compra es la llave de compra y la referencia de detalle_compra; las dos
+-- columnas deben tener el mismo tipo, así que se cambian con las revisiones de
+-- llaves foráneas desactivadas en esta sesión
+SET FOREIGN_KEY_CHECKS = 0;
+ALTER TABLE compra MODIFY folio_compra VARCHAR(255) NOT NULL;
+ALTER TABLE detalle_compra MODIFY folio_compra VARCHAR(255) NULL;
+SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,17 @@
+-- Índices para las consultas más frecuentes (MySQL).
+-- Las bases nuevas los obtienen con `flask --app app crear_esquema`; este script
+-- los agrega a una base existente.
+
+-- /sesion/activa/<clv_usuario>: filtro por usuario y estado
+CREATE INDEX ix_sesion_usuario_estado ON sesion (clv_usuario, estado);
+
+-- Detalles de una venta o compra por folio
+CREATE INDEX ix_detalle_venta_folio_venta ON detalle_venta (folio_venta);
+CREATE INDEX ix_detalle_compra_folio_compra ON detalle_compra (folio_compra);
+
+-- Consultas por rango de fechas
+CREATE INDEX ix_venta_fecha_venta ON venta (fecha_venta);
+CREATE INDEX ix_compra_fecha_compra ON compra (fecha_compra);
+
+-- /producto/disponibles
+CREATE INDEX ix_producto_cantidad_actual ON producto (cantidad_actual);
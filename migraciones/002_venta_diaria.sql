@@ -0,0 +1,21 @@
+-- Acumulado de ventas por día, sesión y producto (MySQL).
+-- Las bases nuevas la obtienen con `flask --app app crear_esquema`; después de
+-- crearla en una base existente hay que llenarla con
+-- `flask --app app reconstruir_ventas_diarias`.
+
+CREATE TABLE venta_diaria (
+    fecha_venta DATE NOT NULL,
+    folio_sesion VARCHAR(18) NOT NULL,
+    codigo_barras VARCHAR(255) NOT NULL,
+    clv_usuario VARCHAR(18) NULL,
+    cantidad INTEGER NOT NULL,
+    importe NUMERIC(12, 2) NOT NULL,
+    lineas INTEGER NOT NULL,
+    PRIMARY KEY (fecha_venta, folio_sesion, codigo_barras),
+    FOREIGN KEY (folio_sesion) REFERENCES sesion (folio_sesion),
+    FOREIGN KEY (codigo_barras) REFERENCES producto (codigo_barras),
+    FOREIGN KEY (clv_usuario) REFERENCES usuario (clv_usuario)
+);
+
+-- /reporte/ventas_diarias agrupado o filtrado por cajero
+CREATE INDEX ix_venta_diaria_usuario_fecha ON venta_diaria (clv_usuario, fecha_venta);
@@ -0,0 +1,9 @@
+-- Índices para /producto/reorden (MySQL 8.0.13 o posterior, por el índice funcional).
+-- Las bases nuevas los obtienen con `flask --app app crear_esquema`; este script
+-- los agrega a una base existente.
+
+-- Filtro cantidad_actual - cantidad_minima <= 0
+CREATE INDEX ix_producto_faltante ON producto ((cantidad_actual - cantidad_minima));
+
+-- Compra más reciente de cada producto para elegir su proveedor
+CREATE INDEX ix_detalle_compra_codigo_barras ON detalle_compra (codigo_barras, folio_compra);
@@ -0,0 +1,18 @@
+-- Historial de movimientos de inventario (MySQL).
+-- Las bases nuevas la obtienen con `flask --app app crear_esquema`; después de
+-- crearla en una base existente hay que registrar las existencias iniciales con
+-- `flask --app app conciliar_existencias`.
+
+CREATE TABLE movimiento_inventario (
+    id_movimiento INTEGER NOT NULL AUTO_INCREMENT,
+    codigo_barras VARCHAR(255) NOT NULL,
+    tipo VARCHAR(20) NOT NULL,
+    cantidad INTEGER NOT NULL,
+    referencia VARCHAR(255) NULL,
+    fecha_hora DATETIME NOT NULL,
+    PRIMARY KEY (id_movimiento),
+    FOREIGN KEY (codigo_barras) REFERENCES producto (codigo_barras)
+);
+
+-- Historial por producto y suma por producto en la conciliación
+CREATE INDEX ix_movimiento_inventario_producto ON movimiento_inventario (codigo_barras, id_movimiento);
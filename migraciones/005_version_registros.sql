@@ -0,0 +1,6 @@
+-- Columna de versión para el control de concurrencia optimista (MySQL).
+-- Los registros existentes empiezan en la versión 1.
+
+ALTER TABLE producto ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE venta ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE compra ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,6 @@
+-- Índice para el barrido de sesiones expiradas (MySQL).
+-- Las bases nuevas lo obtienen con `flask --app app crear_esquema`; este script
+-- lo agrega a una base existente.
+
+-- estado = 'activa' AND fecha_final < hoy
+CREATE INDEX ix_sesion_estado_fecha_final ON sesion (estado, fecha_final);
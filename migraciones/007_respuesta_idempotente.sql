@@ -0,0 +1,18 @@
+-- Respuestas guardadas de los POST con Idempotency-Key (MySQL).
+-- Las bases nuevas la obtienen con `flask --app app crear_esquema`; este script
+-- la agrega a una base existente. Las filas vencidas se purgan con el hilo de
+-- PURGA_IDEMPOTENCIA o con `flask --app app purgar_idempotencia`.
+
+CREATE TABLE respuesta_idempotente (
+    endpoint VARCHAR(100) NOT NULL,
+    clave VARCHAR(255) NOT NULL,
+    huella VARCHAR(64) NOT NULL,
+    estado INTEGER NULL,
+    cuerpo MEDIUMBLOB NULL,
+    encabezados TEXT NULL,
+    expira DATETIME NOT NULL,
+    PRIMARY KEY (endpoint, clave)
+);
+
+-- Purga de las respuestas vencidas
+CREATE INDEX ix_respuesta_idempotente_expira ON respuesta_idempotente (expira);
@@ -0,0 +1,299 @@
+from extensiones import db
+
+# Definición del modelo Categoria
+class Categoria(db.Model):
+    id_categoria = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    descripcion = db.Column(db.String(255), nullable=False)
+
+    def __init__(self, nombre, descripcion):
+        self.nombre = nombre
+        self.descripcion = descripcion
+
+# Definición del modelo Marca
+class Marca(db.Model):
+    id_marca = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    nombre = db.Column(db.String(255), nullable=False)
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+# Definición del modelo Presentacion
+class Presentacion(db.Model):
+    id_presentacion = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    descripcion = db.Column(db.String(255), nullable=False)
+
+    def __init__(self, nombre, descripcion):
+        self.nombre = nombre
+        self.descripcion = descripcion
+
+# Definición del modelo Producto
+class Producto(db.Model):
+    codigo_barras = db.Column(db.String(255), primary_key=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    descripcion = db.Column(db.String(255), nullable=False)
+    id_categoria = db.Column(db.Integer, db.ForeignKey('categoria.id_categoria'), nullable=True)
+    id_presentacion = db.Column(db.Integer, db.ForeignKey('presentacion.id_presentacion'), nullable=True)
+    id_marca = db.Column(db.Integer, db.ForeignKey('marca.id_marca'), nullable=True)
+    cantidad_actual = db.Column(db.Integer, nullable=False)
+    cantidad_maxima = db.Column(db.Integer, nullable=False)
+    cantidad_minima = db.Column(db.Integer, nullable=False)
+    precio = db.Column(db.Numeric(10, 2), nullable=False)
+    estado = db.Column(db.String(255), nullable=False)
+    # Control de concurrencia optimista: cada UPDATE del ORM compara y aumenta la versión
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+
+    # Consulta de productos disponibles (cantidad_actual > 0)
+    __table_args__ = (
+        db.Index('ix_producto_cantidad_actual', 'cantidad_actual'),
+    )
+    __mapper_args__ = {'version_id_col': version}
+
+    def __init__(self, codigo_barras, nombre, descripcion, id_categoria, id_presentacion, id_marca, cantidad_actual, cantidad_maxima, cantidad_minima, precio, estado):
+        self.codigo_barras = codigo_barras
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.id_categoria = id_categoria
+        self.id_presentacion = id_presentacion
+        self.id_marca = id_marca
+        self.cantidad_actual = cantidad_actual
+        self.cantidad_maxima = cantidad_maxima
+        self.cantidad_minima = cantidad_minima
+        self.precio = precio
+        self.estado = estado
+
+# Lista de reorden (cantidad_actual <= cantidad_minima): índice sobre la diferencia
+# para que el filtro no recorra todo el catálogo
+db.Index('ix_producto_faltante', Producto.cantidad_actual - Producto.cantidad_minima)
+
+# Definición del modelo Proveedor
+class Proveedor(db.Model):
+    rfc_proveedor = db.Column(db.String(255), primary_key=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    telefono = db.Column(db.String(255), nullable=False)
+    correo = db.Column(db.String(255), nullable=False)
+
+    def __init__(self, rfc_proveedor, nombre, telefono, correo):
+        self.rfc_proveedor = rfc_proveedor
+        self.nombre = nombre
+        self.telefono = telefono
+        self.correo = correo
+
+# Definición del modelo Rol
+class Rol(db.Model):
+    id_rol = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    descripcion = db.Column(db.String(255), nullable=False)
+
+    def __init__(self, nombre, descripcion):
+        self.nombre = nombre
+        self.descripcion = descripcion
+
+# Definición del modelo Usuario
+class Usuario(db.Model):
+    clv_usuario = db.Column(db.String(18), primary_key=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    apellido1 = db.Column(db.String(255), nullable=False)
+    apellido2 = db.Column(db.String(255), nullable=False)
+    telefono = db.Column(db.String(255), nullable=False)
+    correo = db.Column(db.String(255), nullable=False)
+    direccion = db.Column(db.String(255), nullable=False)
+    id_rol = db.Column(db.Integer, db.ForeignKey('rol.id_rol'), nullable=True)
+    contrasenia = db.Column(db.String(255), nullable=False)
+
+    def __init__(self, clv_usuario, nombre, apellido1, apellido2, telefono, correo, direccion, id_rol, contrasenia):
+        self.clv_usuario = clv_usuario
+        self.nombre = nombre
+        self.apellido1 = apellido1
+        self.apellido2 = apellido2
+        self.telefono = telefono
+        self.correo = correo
+        self.direccion = direccion
+        self.id_rol = id_rol
+        self.contrasenia = contrasenia
+
+# Definición del modelo Cliente
+class Cliente(db.Model):
+    clv_cliente = db.Column(db.String(18), primary_key=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    apellido1 = db.Column(db.String(255), nullable=False)
+    apellido2 = db.Column(db.String(255), nullable=False)
+    telefono = db.Column(db.String(255), nullable=False)
+    correo = db.Column(db.String(255), nullable=False)
+
+    def __init__(self, clv_cliente, nombre, apellido1, apellido2, telefono, correo):
+        self.clv_cliente = clv_cliente
+        self.nombre = nombre
+        self.apellido1 = apellido1
+        self.apellido2 = apellido2
+        self.telefono = telefono
+        self.correo = correo
+
+# Definición del modelo Sesion
+class Sesion(db.Model):
+    folio_sesion = db.Column(db.String(18), primary_key=True)
+    clv_usuario = db.Column(db.String(18), db.ForeignKey('usuario.clv_usuario'), nullable=True)
+    fecha_inicio = db.Column(db.Date, nullable=False)
+    fecha_final = db.Column(db.Date, nullable=False)
+    estado = db.Column(db.String(255), nullable=False)
+
+    # Verificación de sesión activa por usuario
+    __table_args__ = (
+        db.Index('ix_sesion_usuario_estado', 'clv_usuario', 'estado'),
+        db.Index('ix_sesion_estado_fecha_final', 'estado', 'fecha_final'),
+    )
+
+    def __init__(self, folio_sesion, clv_usuario, fecha_inicio, fecha_final, estado):
+        self.folio_sesion = folio_sesion
+        self.clv_usuario = clv_usuario
+        self.fecha_inicio = fecha_inicio
+        self.fecha_final = fecha_final
+        self.estado = estado
+
+# Definición del modelo Venta
+class Venta(db.Model):
+    folio_venta = db.Column(db.String(18), primary_key=True)
+    folio_sesion = db.Column(db.String(18), db.ForeignKey('sesion.folio_sesion'), nullable=False)
+    clv_cliente = db.Column(db.String(18), db.ForeignKey('cliente.clv_cliente'), nullable=False)
+    fecha_venta = db.Column(db.Date, nullable=False)
+    total_venta = db.Column(db.Numeric(10, 2), nullable=False)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    detalles = db.relationship('DetalleVenta', back_populates='venta', passive_deletes=True)
+
+    __table_args__ = (
+        db.Index('ix_venta_fecha_venta', 'fecha_venta'),
+    )
+    __mapper_args__ = {'version_id_col': version}
+
+    def __init__(self, folio_venta, folio_sesion, clv_cliente, fecha_venta, total_venta):
+        self.folio_venta = folio_venta
+        self.folio_sesion = folio_sesion
+        self.clv_cliente = clv_cliente
+        self.fecha_venta = fecha_venta
+        self.total_venta = total_venta
+
+# Definición del modelo DetalleVenta
+class DetalleVenta(db.Model):
+    id_detalle_venta = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    folio_venta = db.Column(db.String(18), db.ForeignKey('venta.folio_venta'), nullable=True)
+    codigo_barras = db.Column(db.String(255), db.ForeignKey('producto.codigo_barras'), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
+    precio_venta = db.Column(db.Numeric(10, 2), nullable=False)
+    venta = db.relationship('Venta', back_populates='detalles')
+    producto = db.relationship('Producto')
+
+    __table_args__ = (
+        db.Index('ix_detalle_venta_folio_venta', 'folio_venta'),
+    )
+
+    def __init__(self, folio_venta, codigo_barras, cantidad, precio_venta):
+        self.folio_venta = folio_venta
+        self.codigo_barras = codigo_barras
+        self.cantidad = cantidad
+        self.precio_venta = precio_venta
+
+# Definición del modelo Compra
+class Compra(db.Model):
+    folio_compra = db.Column(db.String(255), primary_key=True)
+    folio_sesion = db.Column(db.String(18), db.ForeignKey('sesion.folio_sesion'), nullable=False)
+    rfc_proveedor = db.Column(db.String(255), db.ForeignKey('proveedor.rfc_proveedor'), nullable=False)
+    fecha_compra = db.Column(db.Date, nullable=False)
+    total_compra = db.Column(db.Numeric(10, 2), nullable=False)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    detalles = db.relationship('DetalleCompra', back_populates='compra', passive_deletes=True)
+
+    __table_args__ = (
+        db.Index('ix_compra_fecha_compra', 'fecha_compra'),
+    )
+    __mapper_args__ = {'version_id_col': version}
+
+    def __init__(self, folio_compra, folio_sesion, rfc_proveedor, fecha_compra, total_compra):
+        self.folio_compra = folio_compra
+        self.folio_sesion = folio_sesion
+        self.rfc_proveedor = rfc_proveedor
+        self.fecha_compra = fecha_compra
+        self.total_compra = total_compra
+
+# Definición del modelo DetalleCompra
+class DetalleCompra(db.Model):
+    id_detalle_compra = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    folio_compra = db.Column(db.String(255), db.ForeignKey('compra.folio_compra'), nullable=True)
+    codigo_barras = db.Column(db.String(255), db.ForeignKey('producto.codigo_barras'), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
+    precio_compra = db.Column(db.Numeric(10, 2), nullable=False)
+    compra = db.relationship('Compra', back_populates='detalles')
+    producto = db.relationship('Producto')
+
+    __table_args__ = (
+        db.Index('ix_detalle_compra_folio_compra', 'folio_compra'),
+        db.Index('ix_detalle_compra_codigo_barras', 'codigo_barras', 'folio_compra'),
+    )
+
+    def __init__(self, folio_compra, codigo_barras, cantidad, precio_compra):
+        self.folio_compra = folio_compra
+        self.codigo_barras = codigo_barras
+        self.cantidad = cantidad
+        self.precio_compra = precio_compra
+
+# Definición del modelo VentaDiaria: acumulado de ventas por día, sesión y producto,
+# mantenido al cobrar para que los reportes no recorran detalle_venta
+class VentaDiaria(db.Model):
+    fecha_venta = db.Column(db.Date, primary_key=True)
+    folio_sesion = db.Column(db.String(18), db.ForeignKey('sesion.folio_sesion'), primary_key=True)
+    codigo_barras = db.Column(db.String(255), db.ForeignKey('producto.codigo_barras'), primary_key=True)
+    clv_usuario = db.Column(db.String(18), db.ForeignKey('usuario.clv_usuario'), nullable=True)
+    cantidad = db.Column(db.Integer, nullable=False)
+    importe = db.Column(db.Numeric(12, 2), nullable=False)
+    lineas = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_venta_diaria_usuario_fecha', 'clv_usuario', 'fecha_venta'),
+    )
+
+# Definición del modelo MovimientoInventario: historial de solo inserción de las
+# entradas y salidas de cada producto; su suma coincide con Producto.cantidad_actual
+class MovimientoInventario(db.Model):
+    id_movimiento = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    codigo_barras = db.Column(db.String(255), db.ForeignKey('producto.codigo_barras'), nullable=False)
+    tipo = db.Column(db.String(20), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
+    referencia = db.Column(db.String(255), nullable=True)
+    fecha_hora = db.Column(db.DateTime, nullable=False)
+
+    # Historial de un producto y suma por producto en la conciliación
+    __table_args__ = (
+        db.Index('ix_movimiento_inventario_producto', 'codigo_barras', 'id_movimiento'),
+    )
+
+    def __init__(self, codigo_barras, tipo, cantidad, referencia, fecha_hora):
+        self.codigo_barras = codigo_barras
+        self.tipo = tipo
+        self.cantidad = cantidad
+        self.referencia = referencia
+        self.fecha_hora = fecha_hora
+
+# Definición del modelo RespuestaIdempotente: respuesta guardada de un POST con
+# Idempotency-Key. La fila y la respuesta se confirman en el mismo commit que la
+# escritura de la ruta, así que la llave primaria impide repetirla aunque el
+# reintento llegue a otro worker. estado es NULL mientras la respuesta todavía no
+# se guarda, lo que solo ve la propia transacción.
+class RespuestaIdempotente(db.Model):
+    endpoint = db.Column(db.String(100), primary_key=True)
+    clave = db.Column(db.String(255), primary_key=True)
+    huella = db.Column(db.String(64), nullable=False)
+    estado = db.Column(db.Integer, nullable=True)
+    cuerpo = db.Column(db.LargeBinary(2 ** 24), nullable=True)
+    encabezados = db.Column(db.Text, nullable=True)
+    expira = db.Column(db.DateTime, nullable=False)
+
+    # Purga de las respuestas vencidas (PURGA_IDEMPOTENCIA o purgar_idempotencia)
+    __table_args__ = (
+        db.Index('ix_respuesta_idempotente_expira', 'expira'),
+    )
+
+    def __init__(self, endpoint, clave, huella, expira):
+        self.endpoint = endpoint
+        self.clave = clave
+        self.huella = huella
+        self.expira = expira
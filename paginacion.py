@@ -0,0 +1,134 @@
+import operator
+from datetime import date, datetime
+from functools import lru_cache
+
+from flask import current_app, jsonify, request
+from extensiones import db
+from serializacion import serializador
+
+# Tamaños de página por defecto; se pueden sobreescribir en la configuración
+# de la aplicación con TAMANIO_PAGINA y TAMANIO_PAGINA_MAXIMO.
+TAMANIO_PAGINA = 100
+TAMANIO_PAGINA_MAXIMO = 1000
+
+
+def tamanio_pagina():
+    """Devuelve el tamaño de página pedido en ?limite=, acotado al máximo configurado."""
+    por_defecto = current_app.config.get('TAMANIO_PAGINA', TAMANIO_PAGINA)
+    maximo = current_app.config.get('TAMANIO_PAGINA_MAXIMO', TAMANIO_PAGINA_MAXIMO)
+    limite = request.args.get('limite', por_defecto, type=int)
+    if limite is None or limite < 1:
+        limite = por_defecto
+    return min(limite, maximo)
+
+
+# Constructores de la lista blanca de filtros que recibe paginar(): cada
+# parámetro de la URL se asocia a una columna y a la comparación que se aplica.
+def igual(columna):
+    return columna, operator.eq
+
+
+def desde(columna):
+    return columna, operator.ge
+
+
+def hasta(columna):
+    return columna, operator.le
+
+
+def convertir(columna, valor):
+    """Convierte un parámetro de texto al tipo de Python de la columna."""
+    tipo = columna.type.python_type
+    if tipo in (date, datetime):
+        return tipo.fromisoformat(valor)
+    return tipo(valor)
+
+
+@lru_cache(maxsize=256)
+def esquema_parcial(clase, campos):
+    return clase(many=True, only=campos)
+
+
+def proyeccion(llave, esquema):
+    """Columnas pedidas en ?fields=; None si no se pidió proyección.
+
+    Solo se aceptan campos del esquema que sean columnas de la tabla, y la llave
+    siempre se incluye porque de ella sale ``next_cursor``.
+    """
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    columnas = llave.class_.__table__.c
+    campos = [llave.key]
+    for campo in fields.split(','):
+        campo = campo.strip()
+        # Comas sobrantes (?fields=nombre,) no cuentan como campo
+        if not campo:
+            continue
+        if campo not in esquema.dump_fields or campo not in columnas:
+            raise ValueError(campo)
+        if campo not in campos:
+            campos.append(campo)
+    return tuple(campos)
+
+
+def paginar(consulta, llave, esquema, filtros=None):
+    """Pagina una consulta por llave (keyset) ordenando por la llave primaria.
+
+    El cliente recorre la tabla enviando en ?cursor= el valor de ``next_cursor``
+    de la página anterior; cada página cuesta lo mismo sin importar su posición.
+    ``filtros`` asocia parámetros de la URL a (columna, comparación), armados con
+    igual(), desde() y hasta(); cualquier otro parámetro se ignora. Con ?fields=
+    solo se leen de la base las columnas pedidas.
+    """
+    limite = tamanio_pagina()
+    cursor = request.args.get('cursor')
+
+    if cursor is not None:
+        try:
+            cursor = convertir(llave, cursor)
+        except (TypeError, ValueError):
+            return jsonify({'message': 'Cursor inválido'}), 400
+        consulta = consulta.filter(llave > cursor)
+
+    for nombre, (columna, comparacion) in (filtros or {}).items():
+        valor = request.args.get(nombre)
+        if valor is None:
+            continue
+        try:
+            valor = convertir(columna, valor)
+        except (TypeError, ValueError):
+            return jsonify({'message': 'Valor inválido para %s' % nombre}), 400
+        consulta = consulta.filter(comparacion(columna, valor))
+
+    try:
+        campos = proyeccion(llave, esquema)
+    except ValueError as error:
+        return jsonify({'message': 'Campo desconocido en fields: %s' % error}), 400
+
+    # Camino rápido: tuplas de columnas serializadas sin instancias del ORM
+    compilado = serializador(esquema, llave, campos)
+    if compilado is not None:
+        columnas, serializar = compilado
+        # La sentencia se ejecuta en la conexión para saltar la capa de carga del ORM
+        sentencia = consulta.with_entities(*columnas).order_by(llave).limit(limite + 1).statement
+        filas = db.session.connection().execute(sentencia).all()
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            siguiente = filas[-1][0]
+        return jsonify({'datos': [serializar(fila) for fila in filas], 'next_cursor': siguiente})
+
+    if campos is not None:
+        modelo = llave.class_
+        consulta = consulta.with_entities(*(getattr(modelo, campo) for campo in campos))
+        esquema = esquema_parcial(type(esquema), campos)
+
+    # Se pide un registro extra para saber si existe una página siguiente
+    registros = consulta.order_by(llave).limit(limite + 1).all()
+    siguiente = None
+    if len(registros) > limite:
+        registros = registros[:limite]
+        siguiente = getattr(registros[-1], llave.key)
+
+    return jsonify({'datos': esquema.dump(registros), 'next_cursor': siguiente})
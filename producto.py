@@ -1,77 +1,122 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
-from flask_cors import CORS
-from config import config as cn
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = cn.DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-CORS(app)
-CORS(app, resources={
-    r"/*": {
-        "origins": "*"
-    }
-})
-
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
-
-# Modelos
-class Presentacion(db.Model):
-    id_presentacion = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    descripcion = db.Column(db.String(255), nullable=False)
-
-class Marca(db.Model):
-    id_marca = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    nombre = db.Column(db.String(255), nullable=False)
-
-class Categoria(db.Model):
-    id_categoria = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    descripcion = db.Column(db.String(255), nullable=False)
-
-class Producto(db.Model):
-    codigo_barras = db.Column(db.String(255), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    descripcion = db.Column(db.String(255), nullable=False)
-    id_categoria = db.Column(db.Integer, db.ForeignKey('categoria.id_categoria'))
-    id_presentacion = db.Column(db.Integer, db.ForeignKey('presentacion.id_presentacion'))
-    id_marca = db.Column(db.Integer, db.ForeignKey('marca.id_marca'))
-    cantidad_actual = db.Column(db.Integer, nullable=False)
-    cantidad_maxima = db.Column(db.Integer, nullable=False)
-    cantidad_minima = db.Column(db.Integer, nullable=False)
-    precio = db.Column(db.Float, nullable=False)
-    estado = db.Column(db.String(255), nullable=False)
-
-with app.app_context():
-    db.create_all()
+from flask import Blueprint, current_app, jsonify, request
+from decimal import Decimal, InvalidOperation
+from itertools import groupby
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from paginacion import paginar, igual
+from concurrencia import con_version, conflicto_version, verificar_if_match
+from extensiones import db, ma
+from modelos import Producto, Categoria, Presentacion, Marca, Compra, DetalleCompra, Proveedor, MovimientoInventario
+from indice_productos import CAMPOS_PRODUCTO, TAMANIO_LOTE_IN, indice_productos
+from insercion_masiva import insertar_o_actualizar, lotes
+from inventario import APERTURA, AJUSTE, ajustar_existencia, registrar_movimientos
+
+bp = Blueprint('producto', __name__)
+
+# Máximo de códigos aceptados por /producto/resolver; se puede sobreescribir en la
+# configuración con MAXIMO_CODIGOS_RESOLVER.
+MAXIMO_CODIGOS_RESOLVER = 10000
 
 # Esquema de Producto
 class ProductoSchema(ma.Schema):
     class Meta:
-        fields = ('codigo_barras', 'nombre', 'descripcion', 'id_categoria', 'id_presentacion', 'id_marca', 'cantidad_actual', 'cantidad_maxima', 'cantidad_minima', 'precio', 'estado')
+        # Los mismos campos que sirve el índice de códigos de barras
+        fields = CAMPOS_PRODUCTO
 
 productoSchema = ProductoSchema()
 productosSchema = ProductoSchema(many=True)
 
+class MovimientoInventarioSchema(ma.Schema):
+    class Meta:
+        fields = ('id_movimiento', 'codigo_barras', 'tipo', 'cantidad', 'referencia', 'fecha_hora')
+
+movimientos_schema = MovimientoInventarioSchema(many=True)
+
+# Límites de las columnas de Producto: un valor fuera de ellos haría fallar toda
+# la carga masiva en MySQL estricto, así que se reporta como error de la fila
+MAXIMO_ENTERO = 2 ** 31 - 1
+MAXIMO_PRECIO = Decimal('99999999.99')
+
+# Catálogos opcionales de una fila de carga masiva: los que la fila omite no se
+# modifican en los productos existentes
+CATALOGOS_PRODUCTO = ('id_categoria', 'id_presentacion', 'id_marca')
+
+def validar_producto(datos_json, catalogos):
+    """Valida un producto de una carga masiva; devuelve un diccionario campo -> error.
+
+    cantidad_actual se valida solo si viene; la carga masiva la exige únicamente
+    a los productos nuevos.
+    """
+    errores = {}
+    for campo in ('codigo_barras', 'nombre', 'descripcion', 'estado'):
+        valor = datos_json.get(campo)
+        if not isinstance(valor, str) or not valor.strip():
+            errores[campo] = 'Campo requerido'
+        elif len(valor) > Producto.__table__.c[campo].type.length:
+            errores[campo] = 'Admite como máximo %d caracteres' % Producto.__table__.c[campo].type.length
+    for campo in ('cantidad_actual', 'cantidad_maxima', 'cantidad_minima'):
+        valor = datos_json.get(campo)
+        if campo == 'cantidad_actual' and campo not in datos_json:
+            continue
+        if not isinstance(valor, int) or isinstance(valor, bool) or valor < 0 or valor > MAXIMO_ENTERO:
+            errores[campo] = 'Debe ser un entero no negativo'
+    try:
+        precio = Decimal(str(datos_json.get('precio')))
+        if not precio.is_finite() or precio < 0 or precio > MAXIMO_PRECIO:
+            errores['precio'] = 'Debe ser un número no negativo de hasta %s' % MAXIMO_PRECIO
+    except InvalidOperation:
+        errores['precio'] = 'Debe ser un número no negativo'
+    for campo, existentes in catalogos.items():
+        valor = datos_json.get(campo)
+        if valor is not None and valor not in existentes:
+            errores[campo] = 'No existe'
+    return errores
+
+# Filtros aceptados por GET /producto y /producto/disponibles
+FILTROS_PRODUCTO = {
+    'id_categoria': igual(Producto.id_categoria),
+    'id_presentacion': igual(Producto.id_presentacion),
+    'id_marca': igual(Producto.id_marca),
+    'estado': igual(Producto.estado),
+}
+
 # Rutas CRUD
-@app.route('/producto', methods=['GET'])
+@bp.route('/producto', methods=['GET'])
 def obtener_productos():
-    todos_los_productos = Producto.query.all()
-    consulta_productos = productosSchema.dump(todos_los_productos)
-    return jsonify(consulta_productos)
+    return paginar(Producto.query, Producto.codigo_barras, productosSchema, FILTROS_PRODUCTO)
 
-@app.route('/producto/<codigo_barras>', methods=['GET'])
+@bp.route('/producto/<codigo_barras>', methods=['GET'])
 def obtener_producto(codigo_barras):
-    un_producto = Producto.query.filter_by(codigo_barras=codigo_barras).first()
-    if un_producto is None:
+    # Lectura del escáner: se responde desde el índice en memoria
+    encontrado = indice_productos.obtener(codigo_barras)
+    if encontrado is None:
         return jsonify({'message': 'Producto no encontrado'}), 404
-    return productoSchema.jsonify(un_producto)
+    un_producto, version = encontrado
+    return con_version(jsonify(un_producto), version)
+
+# Resolver en una sola petición los códigos escaneados por los contadores de inventario
+@bp.route('/producto/resolver', methods=['POST'])
+def resolver_productos():
+    datos_json = request.get_json(force=True)
+    if not isinstance(datos_json, dict):
+        return jsonify({'message': 'El cuerpo debe ser un objeto JSON'}), 400
+    codigos_barras = datos_json.get('codigos_barras')
+    if not isinstance(codigos_barras, list) or not codigos_barras:
+        return jsonify({'message': 'Se requiere la lista codigos_barras'}), 400
 
-@app.route('/producto/nuevo_producto', methods=['POST'])
+    maximo = current_app.config.get('MAXIMO_CODIGOS_RESOLVER', MAXIMO_CODIGOS_RESOLVER)
+    if len(codigos_barras) > maximo:
+        return jsonify({'message': 'Se aceptan como máximo %d códigos por petición' % maximo}), 400
+
+    # Sin repetidos y en el orden en que se escanearon
+    codigos_barras = list(dict.fromkeys(str(codigo) for codigo in codigos_barras))
+    encontrados = indice_productos.obtener_varios(codigos_barras)
+    return jsonify({
+        'productos': [encontrados[codigo] for codigo in codigos_barras if codigo in encontrados],
+        'no_encontrados': [codigo for codigo in codigos_barras if codigo not in encontrados],
+    })
+
+@bp.route('/producto/nuevo_producto', methods=['POST'])
 def insertar_producto():
     datos_json = request.get_json(force=True)
     nuevo_producto = Producto(
@@ -88,47 +133,239 @@ def insertar_producto():
         estado=datos_json['estado']
     )
     db.session.add(nuevo_producto)
+    db.session.flush()
+    registrar_movimientos(APERTURA, {nuevo_producto.codigo_barras: nuevo_producto.cantidad_actual})
     db.session.commit()
+    indice_productos.invalidar(nuevo_producto.codigo_barras)
     return productoSchema.jsonify(nuevo_producto)
 
-@app.route('/producto/actualizar_producto/<codigo_barras>', methods=['PUT'])
+# Alta o actualización masiva de productos (listas de precios de proveedores)
+@bp.route('/producto/carga_masiva', methods=['POST'])
+def carga_masiva_productos():
+    datos_json = request.get_json(force=True)
+    productos = datos_json.get('productos') if isinstance(datos_json, dict) else datos_json
+    if not isinstance(productos, list) or not productos:
+        return jsonify({'message': 'Se requiere la lista productos'}), 400
+
+    catalogos = {
+        'id_categoria': {id_categoria for id_categoria, in db.session.query(Categoria.id_categoria)},
+        'id_presentacion': {id_presentacion for id_presentacion, in db.session.query(Presentacion.id_presentacion)},
+        'id_marca': {id_marca for id_marca, in db.session.query(Marca.id_marca)},
+    }
+
+    filas = {}
+    indices = {}
+    errores = []
+    for indice, datos in enumerate(productos):
+        if not isinstance(datos, dict):
+            errores.append({'indice': indice, 'codigo_barras': None, 'errores': {'producto': 'Debe ser un objeto'}})
+            continue
+        errores_producto = validar_producto(datos, catalogos)
+        if not errores_producto and datos['codigo_barras'] in filas:
+            errores_producto = {'codigo_barras': 'Repetido en la carga'}
+        if errores_producto:
+            errores.append({'indice': indice, 'codigo_barras': datos.get('codigo_barras'), 'errores': errores_producto})
+            continue
+        fila = {campo: datos[campo] for campo in CAMPOS_PRODUCTO if campo in datos}
+        fila['precio'] = Decimal(str(fila['precio']))
+        fila['version'] = 1
+        filas[fila['codigo_barras']] = fila
+        indices[fila['codigo_barras']] = indice
+
+    # La existencia de los productos que ya están registrados solo cambia por
+    # movimientos; la carga masiva la fija únicamente en los productos nuevos.
+    # En los existentes cantidad_actual es opcional y, si viene, se reporta en
+    # ignorados (el INSERT del upsert necesita un valor, que no se aplica).
+    existentes = set()
+    for lote in lotes(list(filas), TAMANIO_LOTE_IN):
+        existentes.update(codigo for codigo, in db.session.query(Producto.codigo_barras).filter(Producto.codigo_barras.in_(lote)))
+    ignorados = []
+    for codigo, fila in list(filas.items()):
+        if codigo in existentes:
+            if 'cantidad_actual' in fila:
+                ignorados.append(codigo)
+            else:
+                fila['cantidad_actual'] = 0
+        elif 'cantidad_actual' not in fila:
+            errores.append({'indice': indices[codigo], 'codigo_barras': codigo,
+                            'errores': {'cantidad_actual': 'Campo requerido para un producto nuevo'}})
+            del filas[codigo]
+    errores.sort(key=lambda error: error['indice'])
+
+    # Un upsert por combinación de catálogos presentes: solo se actualizan las
+    # columnas que la fila trae (los productos nuevos reciben NULL en las demás)
+    grupos = {}
+    for fila in filas.values():
+        grupos.setdefault(tuple(campo for campo in CATALOGOS_PRODUCTO if campo in fila), []).append(fila)
+    for presentes, filas_grupo in grupos.items():
+        omitidos = [campo for campo in CATALOGOS_PRODUCTO if campo not in presentes]
+        insertar_o_actualizar(
+            Producto.__table__,
+            [dict(fila, **dict.fromkeys(omitidos)) for fila in filas_grupo],
+            llaves=('codigo_barras',),
+            actualizar=[campo for campo in CAMPOS_PRODUCTO if campo not in ('codigo_barras', 'cantidad_actual', *omitidos)],
+            # version vale 1 en cada fila: las nuevas empiezan en 1 y las existentes suben una versión
+            incrementar=('version',),
+        )
+    registrar_movimientos(APERTURA, {
+        codigo: fila['cantidad_actual'] for codigo, fila in filas.items() if codigo not in existentes
+    })
+    db.session.commit()
+    indice_productos.invalidar(*filas)
+    return jsonify({'procesados': len(filas), 'errores': errores, 'ignorados': ignorados})
+
+# Campos que el PUT reemplaza; todos son obligatorios
+CAMPOS_ACTUALIZAR_PRODUCTO = ('nombre', 'descripcion', 'id_categoria', 'id_presentacion', 'id_marca',
+                              'cantidad_maxima', 'cantidad_minima', 'precio', 'estado')
+
+@bp.route('/producto/actualizar_producto/<codigo_barras>', methods=['PUT'])
 def actualizar_producto(codigo_barras):
     producto = Producto.query.filter_by(codigo_barras=codigo_barras).first()
     if producto is None:
         return jsonify({'message': 'Producto no encontrado'}), 404
+    error = verificar_if_match(producto.version)
+    if error is not None:
+        # El ETag viejo pudo salir del índice de este worker: se descarta para
+        # que el cliente relea la versión de la base y el reintento no vuelva a fallar
+        indice_productos.invalidar(codigo_barras)
+        return error
 
+    # cantidad_actual se rechaza: la existencia solo cambia por movimientos
+    # (cobros, recepciones y /producto/<codigo>/ajuste), que no suben la versión,
+    # así que reemplazarla aquí desharía las ventas cobradas desde la lectura
     datos_json = request.get_json(force=True)
-    producto.nombre = datos_json['nombre']
-    producto.descripcion = datos_json['descripcion']
-    producto.id_categoria = datos_json['id_categoria']
-    producto.id_presentacion = datos_json['id_presentacion']
-    producto.id_marca = datos_json['id_marca']
-    producto.cantidad_actual = datos_json['cantidad_actual']
-    producto.cantidad_maxima = datos_json['cantidad_maxima']
-    producto.cantidad_minima = datos_json['cantidad_minima']
-    producto.precio = datos_json['precio']
-    producto.estado = datos_json['estado']
+    if not isinstance(datos_json, dict):
+        return jsonify({'message': 'El cuerpo debe ser un objeto JSON'}), 400
+    if 'cantidad_actual' in datos_json:
+        return jsonify({'message': 'cantidad_actual no se modifica con esta ruta; omítala y use '
+                                   'POST /producto/%s/ajuste para cambiar la existencia' % codigo_barras}), 422
+    faltantes = [campo for campo in CAMPOS_ACTUALIZAR_PRODUCTO if campo not in datos_json]
+    if faltantes:
+        return jsonify({'message': 'Faltan datos necesarios', 'campos': faltantes}), 400
+    for campo in CAMPOS_ACTUALIZAR_PRODUCTO:
+        setattr(producto, campo, datos_json[campo])
 
+    # Otra petición escribió entre la lectura y el UPDATE
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        indice_productos.invalidar(codigo_barras)
+        return conflicto_version(db.session.query(Producto.version).filter_by(codigo_barras=codigo_barras).scalar())
+    indice_productos.invalidar(codigo_barras)
+    return con_version(productoSchema.jsonify(producto), producto.version)
+
+# Ajuste de inventario (merma, conteo físico, devolución): suma la cantidad con un
+# UPDATE atómico, sin reemplazar la existencia
+@bp.route('/producto/<codigo_barras>/ajuste', methods=['POST'])
+def ajustar_producto(codigo_barras):
+    datos_json = request.get_json(force=True)
+    if not isinstance(datos_json, dict):
+        return jsonify({'message': 'El cuerpo debe ser un objeto JSON'}), 400
+    cantidad = datos_json.get('cantidad')
+    if not isinstance(cantidad, int) or isinstance(cantidad, bool) or cantidad == 0:
+        return jsonify({'message': 'cantidad debe ser un entero distinto de cero'}), 400
+    # El motivo se guarda en la referencia del movimiento
+    motivo = datos_json.get('motivo')
+    longitud = MovimientoInventario.__table__.c.referencia.type.length
+    if motivo is not None and (not isinstance(motivo, str) or len(motivo) > longitud):
+        return jsonify({'message': 'motivo debe ser un texto de hasta %d caracteres' % longitud}), 400
+
+    if not ajustar_existencia(codigo_barras, cantidad, AJUSTE, motivo):
+        db.session.rollback()
+        if db.session.get(Producto, codigo_barras) is None:
+            return jsonify({'message': 'Producto no encontrado'}), 404
+        return jsonify({'message': 'Existencias insuficientes'}), 409
     db.session.commit()
-    return productoSchema.jsonify(producto)
+    indice_productos.invalidar(codigo_barras)
+    cantidad_actual = db.session.query(Producto.cantidad_actual).filter_by(codigo_barras=codigo_barras).scalar()
+    return jsonify({'codigo_barras': codigo_barras, 'cantidad_actual': cantidad_actual})
 
-@app.route('/producto/eliminar_producto/<codigo_barras>', methods=['DELETE'])
+# Historial de movimientos de un producto, del más antiguo al más reciente
+@bp.route('/producto/<codigo_barras>/movimientos', methods=['GET'])
+def obtener_movimientos(codigo_barras):
+    movimientos = MovimientoInventario.query.filter_by(codigo_barras=codigo_barras)
+    return paginar(movimientos, MovimientoInventario.id_movimiento, movimientos_schema)
+
+@bp.route('/producto/eliminar_producto/<codigo_barras>', methods=['DELETE'])
 def eliminar_producto(codigo_barras):
     producto = Producto.query.filter_by(codigo_barras=codigo_barras).first()
     if producto is None:
         return jsonify({'message': 'Producto no encontrado'}), 404
 
+    # El historial de movimientos es de solo inserción, así que un producto con
+    # movimientos, ventas o compras no se puede borrar y se responde 409 para que
+    # el cliente cambie su estado a inactivo. Un producto dado de alta con
+    # existencia mayor a cero ya tiene su movimiento de apertura: solo se puede
+    # borrar uno registrado con existencia cero y sin movimientos posteriores.
     db.session.delete(producto)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'El producto tiene movimientos de inventario (incluida la apertura de su '
+                                   'existencia inicial), ventas o compras registrados y no se puede eliminar; '
+                                   'cambie su estado a inactivo'}), 409
+    indice_productos.invalidar(codigo_barras)
     return productoSchema.jsonify(producto)
     
 # Nueva ruta para obtener productos con cantidad_actual mayor a 0
-@app.route('/producto/disponibles', methods=['GET'])
+@bp.route('/producto/disponibles', methods=['GET'])
 def obtener_productos_disponibles():
-    productos_disponibles = Producto.query.filter(Producto.cantidad_actual > 0).all()
-    consulta_productos_disponibles = productosSchema.dump(productos_disponibles)
-    return jsonify(consulta_productos_disponibles)    
+    productos_disponibles = Producto.query.filter(Producto.cantidad_actual > 0)
+    return paginar(productos_disponibles, Producto.codigo_barras, productosSchema, FILTROS_PRODUCTO)
+
+# Lista de reorden: productos en o bajo su mínimo, agrupados por el proveedor de
+# su compra más reciente, resuelta en una sola consulta
+@bp.route('/producto/reorden', methods=['GET'])
+def obtener_reorden():
+    ultimo_proveedor = (
+        db.select(Compra.rfc_proveedor)
+        .join(DetalleCompra, DetalleCompra.folio_compra == Compra.folio_compra)
+        .where(DetalleCompra.codigo_barras == Producto.codigo_barras)
+        .order_by(Compra.fecha_compra.desc(), DetalleCompra.id_detalle_compra.desc())
+        .limit(1)
+        .correlate(Producto)
+        .scalar_subquery()
+    )
+    faltantes = (
+        db.select(
+            Producto.codigo_barras,
+            Producto.nombre,
+            Producto.cantidad_actual,
+            Producto.cantidad_minima,
+            Producto.cantidad_maxima,
+            (Producto.cantidad_maxima - Producto.cantidad_actual).label('cantidad_sugerida'),
+            ultimo_proveedor.label('rfc_proveedor'),
+        )
+        # Misma expresión que ix_producto_faltante para que se use el índice
+        .where(Producto.cantidad_actual - Producto.cantidad_minima <= 0)
+        .subquery()
+    )
+    consulta = (
+        db.select(faltantes, Proveedor.nombre.label('nombre_proveedor'))
+        .outerjoin(Proveedor, Proveedor.rfc_proveedor == faltantes.c.rfc_proveedor)
+        .order_by(faltantes.c.rfc_proveedor, faltantes.c.codigo_barras)
+    )
+    rfc_proveedor = request.args.get('rfc_proveedor')
+    if rfc_proveedor:
+        consulta = consulta.where(faltantes.c.rfc_proveedor == rfc_proveedor)
 
-if __name__ == "__main__":
-    app.run(debug=True, port=4040, host="localhost")
+    proveedores = []
+    filas = db.session.execute(consulta).mappings()
+    for (rfc, nombre), productos in groupby(filas, lambda fila: (fila['rfc_proveedor'], fila['nombre_proveedor'])):
+        proveedores.append({
+            'rfc_proveedor': rfc,
+            'nombre_proveedor': nombre,
+            'productos': [
+                {campo: fila[campo] for campo in ('codigo_barras', 'nombre', 'cantidad_actual',
+                                                  'cantidad_minima', 'cantidad_maxima', 'cantidad_sugerida')}
+                for fila in productos
+            ],
+        })
+    return jsonify(proveedores)
 
+# Aciertos y fallos del índice de códigos de barras de este worker
+@bp.route('/producto/indice/estadisticas', methods=['GET'])
+def estadisticas_indice_productos():
+    return jsonify(indice_productos.estadisticas())    
@@ -1,33 +1,20 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
-from flask_cors import CORS
-from config.config import DATABASE_URL
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-CORS(app)
-
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
-
-# Definición del modelo Proveedor
-class Proveedor(db.Model):
-    rfc_proveedor = db.Column(db.String(255), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    telefono = db.Column(db.String(255), nullable=False)
-    correo = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, rfc_proveedor, nombre, telefono, correo):
-        self.rfc_proveedor = rfc_proveedor
-        self.nombre = nombre
-        self.telefono = telefono
-        self.correo = correo
+from flask import Blueprint, jsonify, request
+from marshmallow.validate import Length
+from paginacion import paginar
+from importacion import formato_solicitado, importar
+from extensiones import db, ma
+from modelos import Proveedor
+
+bp = Blueprint('proveedor', __name__)
 
 # Definición del esquema Proveedor
 class ProveedorSchema(ma.Schema):
+    # Validación usada al importar proveedores
+    rfc_proveedor = ma.String(required=True, validate=Length(min=1, max=255))
+    nombre = ma.String(required=True, validate=Length(min=1, max=255))
+    telefono = ma.String(required=True, validate=Length(min=1, max=255))
+    correo = ma.String(required=True, validate=Length(min=1, max=255))
+
     class Meta:
         fields = ('rfc_proveedor', 'nombre', 'telefono', 'correo')
 
@@ -35,20 +22,18 @@ proveedor_schema = ProveedorSchema()
 proveedores_schema = ProveedorSchema(many=True)
 
 # Métodos de la API
-@app.route('/proveedor', methods=['GET'])
+@bp.route('/proveedor', methods=['GET'])
 def obtenerProveedores():
-    todos_los_proveedores = Proveedor.query.all()
-    consulta_proveedores = proveedores_schema.dump(todos_los_proveedores)
-    return jsonify(consulta_proveedores)
+    return paginar(Proveedor.query, Proveedor.rfc_proveedor, proveedores_schema)
 
-@app.route('/proveedor/<string:rfc_proveedor>', methods=['GET'])
+@bp.route('/proveedor/<string:rfc_proveedor>', methods=['GET'])
 def obtenerProveedor(rfc_proveedor):
     un_proveedor = Proveedor.query.get(rfc_proveedor)
     if un_proveedor is None:
         return jsonify({'message': 'Proveedor no encontrado'}), 404
     return proveedor_schema.jsonify(un_proveedor)
 
-@app.route('/proveedor/nuevo_proveedor', methods=['POST'])
+@bp.route('/proveedor/nuevo_proveedor', methods=['POST'])
 def insertarProveedor():
     datosJSON = request.get_json(force=True)
     rfc_proveedor = datosJSON.get('rfc_proveedor')
@@ -65,7 +50,14 @@ def insertarProveedor():
     db.session.commit()
     return proveedor_schema.jsonify(nuevo_proveedor), 201
 
-@app.route('/proveedor/actualizar_proveedor/<string:rfc_proveedor>', methods=['PUT'])
+@bp.route('/proveedor/importar', methods=['POST'])
+def importarProveedores():
+    formato = formato_solicitado()
+    if formato is None:
+        return jsonify({'message': 'Envíe text/csv o application/x-ndjson'}), 415
+    return jsonify(importar(Proveedor, proveedor_schema, request.stream, formato))
+
+@bp.route('/proveedor/actualizar_proveedor/<string:rfc_proveedor>', methods=['PUT'])
 def actualizarProveedor(rfc_proveedor):
     actualizar_proveedor = Proveedor.query.get(rfc_proveedor)
     if actualizar_proveedor is None:
@@ -83,7 +75,7 @@ def actualizarProveedor(rfc_proveedor):
     db.session.commit()
     return proveedor_schema.jsonify(actualizar_proveedor)
 
-@app.route('/proveedor/eliminar_proveedor/<string:rfc_proveedor>', methods=['DELETE'])
+@bp.route('/proveedor/eliminar_proveedor/<string:rfc_proveedor>', methods=['DELETE'])
 def eliminarProveedor(rfc_proveedor):
     eliminar_proveedor = Proveedor.query.get(rfc_proveedor)
     if eliminar_proveedor is None:
@@ -92,7 +84,3 @@ def eliminarProveedor(rfc_proveedor):
     db.session.delete(eliminar_proveedor)
     db.session.commit()
     return proveedor_schema.jsonify(eliminar_proveedor)
-
-if __name__ == "__main__":
-    app.run(debug=True, port=4040, host="127.0.0.1")
-
@@ -0,0 +1,60 @@
+from flask import Blueprint, jsonify, request
+from sqlalchemy import func
+from datetime import datetime
+from extensiones import db
+from modelos import VentaDiaria
+
+bp = Blueprint('reporte', __name__)
+
+# Dimensiones por las que se puede agrupar el acumulado diario
+DIMENSIONES = {
+    'fecha': VentaDiaria.fecha_venta,
+    'sesion': VentaDiaria.folio_sesion,
+    'usuario': VentaDiaria.clv_usuario,
+    'producto': VentaDiaria.codigo_barras,
+}
+
+
+def leer_fecha(nombre):
+    valor = request.args.get(nombre)
+    if not valor:
+        return None
+    return datetime.strptime(valor, '%Y-%m-%d').date()
+
+
+# Métodos de la API
+# Lee de venta_diaria, así que el costo depende de los días consultados y no del
+# número de líneas vendidas
+@bp.route('/reporte/ventas_diarias', methods=['GET'])
+def reporte_ventas_diarias():
+    agrupar = [nombre for nombre in request.args.get('agrupar', 'fecha').split(',') if nombre]
+    desconocidas = [nombre for nombre in agrupar if nombre not in DIMENSIONES]
+    if not agrupar or desconocidas:
+        return jsonify({'message': 'agrupar admite: %s' % ', '.join(DIMENSIONES)}), 400
+    try:
+        desde = leer_fecha('desde')
+        hasta = leer_fecha('hasta')
+    except ValueError:
+        return jsonify({'message': 'Las fechas deben tener el formato AAAA-MM-DD'}), 400
+
+    columnas = [DIMENSIONES[nombre] for nombre in agrupar]
+    consulta = db.session.query(
+        *columnas,
+        func.sum(VentaDiaria.cantidad),
+        func.sum(VentaDiaria.importe),
+        func.sum(VentaDiaria.lineas),
+    )
+    if desde is not None:
+        consulta = consulta.filter(VentaDiaria.fecha_venta >= desde)
+    if hasta is not None:
+        consulta = consulta.filter(VentaDiaria.fecha_venta <= hasta)
+    consulta = consulta.group_by(*columnas).order_by(*columnas)
+
+    resultado = []
+    for fila in consulta:
+        renglon = dict(zip(agrupar, fila[:len(agrupar)]))
+        if 'fecha' in renglon:
+            renglon['fecha'] = renglon['fecha'].isoformat()
+        renglon['cantidad'], renglon['importe'], renglon['lineas'] = fila[len(agrupar):]
+        resultado.append(renglon)
+    return jsonify(resultado)
@@ -0,0 +1,71 @@
+from datetime import date, datetime, time
+from functools import lru_cache
+
+
+def _isoformat(valor):
+    return valor.isoformat()
+
+
+# Conversiones que hace marshmallow al serializar; los Decimal se dejan tal cual
+# para que el proveedor JSON los escriba como texto, igual que con dump()
+CONVERSIONES = {
+    date: _isoformat,
+    datetime: _isoformat,
+    time: _isoformat,
+}
+
+
+@lru_cache(maxsize=256)
+def _compilar(clase_esquema, modelo, llave, campos):
+    esquema = clase_esquema(only=campos) if campos else clase_esquema()
+    tabla = modelo.__table__
+    # La llave va primero para sacar next_cursor de la última tupla
+    atributos = [llave]
+    nombres = [None]
+    for nombre, campo in esquema.dump_fields.items():
+        atributo = campo.attribute or nombre
+        if atributo not in tabla.c:
+            # Campos calculados o anidados: este esquema sigue usando dump()
+            return None
+        if atributo == llave:
+            nombres[0] = campo.data_key or nombre
+        else:
+            atributos.append(atributo)
+            nombres.append(campo.data_key or nombre)
+
+    if nombres[0] is None:
+        # El esquema no incluye la llave
+        return None
+
+    columnas = tuple(getattr(modelo, atributo) for atributo in atributos)
+    convertidores = tuple(
+        (posicion, CONVERSIONES[tabla.c[atributo].type.python_type])
+        for posicion, atributo in enumerate(atributos)
+        if tabla.c[atributo].type.python_type in CONVERSIONES
+    )
+    llaves = tuple(nombres)
+    if not convertidores:
+        def serializar(fila):
+            return dict(zip(llaves, fila))
+    else:
+        def serializar(fila):
+            registro = dict(zip(llaves, fila))
+            for posicion, convertir in convertidores:
+                valor = fila[posicion]
+                if valor is not None:
+                    registro[llaves[posicion]] = convertir(valor)
+            return registro
+
+    return columnas, serializar
+
+
+def serializador(esquema, llave, campos=None):
+    """Columnas y función que convierte tuplas de la base al mismo dict que esquema.dump().
+
+    Evita hidratar instancias del ORM y recorrer los campos de marshmallow por
+    cada fila en las rutas de solo lectura. La función se arma una vez por
+    esquema y proyección. Devuelve None si el esquema tiene campos que no son
+    columnas de la tabla de ``llave`` o no incluye la llave; en ese caso hay
+    que usar dump().
+    """
+    return _compilar(type(esquema), llave.class_, llave.key, campos)
@@ -1,73 +1,14 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
-from flask_cors import CORS
-from config import config as cn
-from datetime import datetime
-
-# Configuración de la aplicación y la base de datos
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = cn.DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Configuración de CORS
-CORS(app)
-CORS(app, resources={r"/*": {"origins": "*"}})
-
-# Inicialización de SQLAlchemy y Marshmallow
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
-
-# Definición del modelo Rol
-class Rol(db.Model):
-    id_rol = db.Column(db.Integer, primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    descripcion = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, nombre, descripcion):
-        self.nombre = nombre
-        self.descripcion = descripcion
-
-# Definición del modelo Usuario
-class Usuario(db.Model):
-    clv_usuario = db.Column(db.String(18), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    apellido1 = db.Column(db.String(255), nullable=False)
-    apellido2 = db.Column(db.String(255), nullable=False)
-    telefono = db.Column(db.String(255), nullable=False)
-    correo = db.Column(db.String(255), nullable=False)
-    direccion = db.Column(db.String(255), nullable=False)
-    id_rol = db.Column(db.Integer, db.ForeignKey('rol.id_rol'), nullable=True)
-    contrasenia = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, clv_usuario, nombre, apellido1, apellido2, telefono, correo, direccion, id_rol, contrasenia):
-        self.clv_usuario = clv_usuario
-        self.nombre = nombre
-        self.apellido1 = apellido1
-        self.apellido2 = apellido2
-        self.telefono = telefono
-        self.correo = correo
-        self.direccion = direccion
-        self.id_rol = id_rol
-        self.contrasenia = contrasenia
-
-# Definición del modelo Sesion
-class Sesion(db.Model):
-    folio_sesion = db.Column(db.String(18), primary_key=True)
-    clv_usuario = db.Column(db.String(18), db.ForeignKey('usuario.clv_usuario'), nullable=True)
-    fecha_inicio = db.Column(db.Date, nullable=False)
-    fecha_final = db.Column(db.Date, nullable=False)
-    estado = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, folio_sesion, clv_usuario, fecha_inicio, fecha_final, estado):
-        self.folio_sesion = folio_sesion
-        self.clv_usuario = clv_usuario
-        self.fecha_inicio = fecha_inicio
-        self.fecha_final = fecha_final
-        self.estado = estado
-
-with app.app_context():
-    db.create_all()
+from flask import Blueprint, jsonify, request
+from paginacion import paginar, igual
+from datetime import date, datetime
+from extensiones import db, ma
+from modelos import Sesion
+from tokens_sesion import emitir_token, leer_token, sesiones_activas, tokens_habilitados
+from barrido_sesiones import barredor_sesiones
+
+bp = Blueprint('sesion', __name__)
+
+MENSAJE_SIN_TOKENS = 'Los tokens de sesión requieren CLAVE_TOKENS_SESION o SECRET_KEY en la configuración'
 
 # Definición del esquema Sesion
 class SesionSchema(ma.Schema):
@@ -77,15 +18,19 @@ class SesionSchema(ma.Schema):
 sesion_schema = SesionSchema()
 sesiones_schema = SesionSchema(many=True)
 
+# Filtros aceptados por GET /sesion
+FILTROS_SESION = {
+    'clv_usuario': igual(Sesion.clv_usuario),
+    'estado': igual(Sesion.estado),
+}
+
 # GET todas las sesiones
-@app.route('/sesion', methods=['GET'])
+@bp.route('/sesion', methods=['GET'])
 def obtenerSesiones():
-    todas_las_sesiones = Sesion.query.all()
-    consulta_sesiones = sesiones_schema.dump(todas_las_sesiones)
-    return jsonify(consulta_sesiones)
+    return paginar(Sesion.query, Sesion.folio_sesion, sesiones_schema, FILTROS_SESION)
 
 # GET una sesion por folio
-@app.route('/sesion/<string:folio_sesion>', methods=['GET'])
+@bp.route('/sesion/<string:folio_sesion>', methods=['GET'])
 def obtenerSesion(folio_sesion):
     una_sesion = Sesion.query.get(folio_sesion)
     if una_sesion is None:
@@ -93,7 +38,7 @@ def obtenerSesion(folio_sesion):
     return sesion_schema.jsonify(una_sesion)
 
 # POST nueva sesion
-@app.route('/sesion/nueva_sesion', methods=['POST'])
+@bp.route('/sesion/nueva_sesion', methods=['POST'])
 def insertar_sesion():
     datosJSON = request.get_json(force=True)
     folio_sesion = datosJSON.get('folio_sesion')
@@ -108,10 +53,30 @@ def insertar_sesion():
     nueva_sesion = Sesion(folio_sesion, clv_usuario, fecha_inicio, fecha_final, estado)
     db.session.add(nueva_sesion)
     db.session.commit()
-    return sesion_schema.jsonify(nueva_sesion), 201
+    sesiones_activas.actualizar(nueva_sesion)
+
+    # El token solo se emite si hay clave de firma; la sesión ya quedó guardada
+    datos = sesion_schema.dump(nueva_sesion)
+    if nueva_sesion.estado == 'activa' and tokens_habilitados():
+        datos['token'], datos['expira'] = emitir_token(nueva_sesion)
+    return jsonify(datos), 201
+
+# POST token para una sesión activa ya registrada
+@bp.route('/sesion/<string:folio_sesion>/token', methods=['POST'])
+def emitir_token_sesion(folio_sesion):
+    if not tokens_habilitados():
+        return jsonify({'message': MENSAJE_SIN_TOKENS}), 503
+    una_sesion = Sesion.query.get(folio_sesion)
+    if una_sesion is None:
+        return jsonify({'message': 'Sesión no encontrada'}), 404
+    if una_sesion.estado != 'activa':
+        return jsonify({'message': 'La sesión no está activa'}), 409
+    sesiones_activas.actualizar(una_sesion)
+    token, expira = emitir_token(una_sesion)
+    return jsonify({'folio_sesion': folio_sesion, 'token': token, 'expira': expira})
 
 # PUT actualizar sesion
-@app.route('/sesion/actualizar_sesion/<string:folio_sesion>', methods=['PUT'])
+@bp.route('/sesion/actualizar_sesion/<string:folio_sesion>', methods=['PUT'])
 def actualizarSesion(folio_sesion):
     actualizar_sesion = Sesion.query.get(folio_sesion)
     if actualizar_sesion is None:
@@ -130,10 +95,11 @@ def actualizarSesion(folio_sesion):
     actualizar_sesion.estado = datosJSON.get('estado', actualizar_sesion.estado)
 
     db.session.commit()
+    sesiones_activas.actualizar(actualizar_sesion)
     return sesion_schema.jsonify(actualizar_sesion)
 
 # DELETE eliminar sesion
-@app.route('/sesion/eliminar_sesion/<string:folio_sesion>', methods=['DELETE'])
+@bp.route('/sesion/eliminar_sesion/<string:folio_sesion>', methods=['DELETE'])
 def eliminarSesion(folio_sesion):
     eliminar_sesion = Sesion.query.get(folio_sesion)
     if eliminar_sesion is None:
@@ -141,17 +107,41 @@ def eliminarSesion(folio_sesion):
 
     db.session.delete(eliminar_sesion)
     db.session.commit()
+    sesiones_activas.revocar(folio_sesion)
     return sesion_schema.jsonify(eliminar_sesion)
 
 # Nueva ruta para verificar si la sesión de un usuario está activa
-@app.route('/sesion/activa/<string:clv_usuario>', methods=['GET'])
+@bp.route('/sesion/activa/<string:clv_usuario>', methods=['GET'])
 def sesion_activa(clv_usuario):
-    sesion_activa = Sesion.query.filter_by(clv_usuario=clv_usuario, estado='activa').first()
+    # Las sesiones vencidas que el barrido todavía no cierra tampoco cuentan
+    sesion_activa = (
+        Sesion.query
+        .filter_by(clv_usuario=clv_usuario, estado='activa')
+        .filter(Sesion.fecha_final >= date.today())
+        .first()
+    )
     if sesion_activa:
         return jsonify({'activa': True, 'folio_sesion': sesion_activa.folio_sesion})
     else:
         return jsonify({'activa': False, 'folio_sesion': None})
 
-if __name__ == "__main__":
-    app.run(debug=True, port=4042, host="localhost")
+# Verificación de la sesión con el token (Authorization: Bearer <token>): la firma
+# y la lista de sesiones activas en memoria bastan; solo un folio que este worker
+# todavía no conoce se busca una vez en la base
+@bp.route('/sesion/activa', methods=['GET'])
+def sesion_activa_token():
+    if not tokens_habilitados():
+        return jsonify({'message': MENSAJE_SIN_TOKENS}), 503
+    encabezado = request.headers.get('Authorization', '')
+    if not encabezado.startswith('Bearer '):
+        return jsonify({'message': 'Se requiere el encabezado Authorization: Bearer <token>'}), 401
+    datos = leer_token(encabezado[len('Bearer '):].strip())
+    if datos is None or not sesiones_activas.valida(datos['folio_sesion'], datos['clv_usuario']):
+        return jsonify({'activa': False, 'folio_sesion': None})
+    return jsonify({'activa': True, 'folio_sesion': datos['folio_sesion'],
+                    'clv_usuario': datos['clv_usuario'], 'expira': datos['expira']})
 
+# Métricas del barrido de sesiones expiradas de este worker
+@bp.route('/sesion/barrido/estadisticas', methods=['GET'])
+def estadisticas_barrido_sesiones():
+    return jsonify(barredor_sesiones.estadisticas())
@@ -0,0 +1,56 @@
+import threading
+
+from extensiones import db
+
+
+class TareaPeriodica:
+    """Hilo en segundo plano de un worker que ejecuta ``funcion(app)`` cada cierto intervalo.
+
+    El intervalo se lee de la configuración con ``clave_intervalo`` (por omisión
+    ``intervalo`` segundos). Con ``inmediata=False`` la primera ejecución espera
+    un intervalo completo. Cada ejecución corre en su propio contexto de
+    aplicación; un error se registra en el log con ``descripcion`` y no detiene
+    el hilo.
+    """
+
+    def __init__(self, nombre, funcion, clave_intervalo, intervalo, descripcion, inmediata=True):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.clave_intervalo = clave_intervalo
+        self.intervalo = intervalo
+        self.descripcion = descripcion
+        self.inmediata = inmediata
+        self._hilo = None
+        self._detener = threading.Event()
+        self._candado = threading.Lock()
+
+    def _ciclo(self, app):
+        intervalo = app.config.get(self.clave_intervalo, self.intervalo)
+        if not self.inmediata and self._detener.wait(intervalo):
+            return
+        while True:
+            with app.app_context():
+                try:
+                    self.funcion(app)
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception('Falló %s', self.descripcion)
+                finally:
+                    db.session.remove()
+            if self._detener.wait(intervalo):
+                return
+
+    def iniciar(self, app):
+        """Arranca el hilo del worker; llamadas repetidas no crean otro."""
+        with self._candado:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ciclo, args=(app,), name=self.nombre, daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def activa(self):
+        return self._hilo is not None and self._hilo.is_alive()
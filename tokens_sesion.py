@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import date
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from extensiones import db
+from modelos import Sesion
+
+# Vigencia de un token de sesión en segundos; se puede sobreescribir en la
+# configuración con DURACION_TOKEN_SESION.
+DURACION_TOKEN_SESION = 12 * 60 * 60
+
+# Cada cuántos segundos un worker vuelve a leer las sesiones activas para ver las
+# revocaciones hechas en otros workers; se puede sobreescribir en la
+# configuración con REFRESCO_SESIONES_ACTIVAS.
+REFRESCO_SESIONES_ACTIVAS = 30
+
+
+def _clave():
+    # Todos los workers deben firmar con la misma clave
+    return current_app.config.get('CLAVE_TOKENS_SESION') or current_app.secret_key
+
+
+def tokens_habilitados():
+    """True si hay clave para firmar; sin ella las sesiones funcionan como antes, sin token."""
+    return bool(_clave())
+
+
+def _serializador():
+    clave = _clave()
+    if not clave:
+        raise RuntimeError('Configure CLAVE_TOKENS_SESION o SECRET_KEY para firmar los tokens de sesión')
+    return URLSafeSerializer(clave, salt='sesion')
+
+
+def emitir_token(sesion):
+    """Token firmado con el folio, el usuario y la expiración de la sesión."""
+    duracion = current_app.config.get('DURACION_TOKEN_SESION', DURACION_TOKEN_SESION)
+    expira = int(time.time()) + duracion
+    token = _serializador().dumps({'folio_sesion': sesion.folio_sesion, 'clv_usuario': sesion.clv_usuario, 'expira': expira})
+    return token, expira
+
+
+def leer_token(token):
+    """Datos del token si la firma es válida y no ha expirado; None en otro caso. No consulta la base."""
+    try:
+        datos = _serializador().loads(token)
+    except BadSignature:
+        return None
+    if not isinstance(datos, dict) or datos.get('expira', 0) < time.time():
+        return None
+    return datos
+
+
+class SesionesActivas:
+    """Folios de las sesiones activas de este worker, con el usuario de cada una.
+
+    Un token solo es válido si su folio sigue activo con el mismo usuario, así que
+    cerrar, reasignar o eliminar una sesión lo revoca: de inmediato en el worker
+    que atendió el cambio y en los demás al siguiente refresco. Un folio que no
+    está en memoria (por ejemplo una sesión abierta en otro worker después del
+    último refresco) se busca una vez por llave primaria y el resultado, activo
+    o no, se guarda hasta el siguiente refresco.
+    """
+
+    def __init__(self):
+        self._activas = {}
+        self._inactivas = set()
+        self._leidas = None
+        self._candado = threading.Lock()
+        self._refresco = threading.Lock()
+
+    def refrescar(self):
+        activas = dict(
+            db.session.query(Sesion.folio_sesion, Sesion.clv_usuario)
+            .filter(Sesion.estado == 'activa', Sesion.fecha_final >= date.today())
+        )
+        with self._candado:
+            self._activas = activas
+            self._inactivas = set()
+            self._leidas = time.monotonic()
+
+    def _vigentes(self):
+        intervalo = current_app.config.get('REFRESCO_SESIONES_ACTIVAS', REFRESCO_SESIONES_ACTIVAS)
+        leidas = self._leidas
+        if leidas is None or time.monotonic() - leidas > intervalo:
+            # Un solo hilo refresca; los demás siguen con el conjunto anterior,
+            # salvo la primera vez, cuando todavía no hay conjunto
+            if self._refresco.acquire(blocking=leidas is None):
+                try:
+                    if self._leidas == leidas:
+                        self.refrescar()
+                finally:
+                    self._refresco.release()
+        return self._activas
+
+    def _consultar(self, folio_sesion):
+        sesion = (
+            db.session.query(Sesion.clv_usuario)
+            .filter(Sesion.folio_sesion == folio_sesion, Sesion.estado == 'activa', Sesion.fecha_final >= date.today())
+            .first()
+        )
+        with self._candado:
+            if sesion is None:
+                self._inactivas.add(folio_sesion)
+            else:
+                self._activas[folio_sesion] = sesion.clv_usuario
+        return sesion
+
+    def valida(self, folio_sesion, clv_usuario):
+        vigentes = self._vigentes()
+        if folio_sesion in vigentes:
+            return vigentes[folio_sesion] == clv_usuario
+        if folio_sesion in self._inactivas:
+            return False
+        sesion = self._consultar(folio_sesion)
+        return sesion is not None and sesion.clv_usuario == clv_usuario
+
+    def actualizar(self, sesion):
+        """Refleja en memoria el alta o modificación de una sesión."""
+        with self._candado:
+            if sesion.estado == 'activa':
+                self._activas[sesion.folio_sesion] = sesion.clv_usuario
+                self._inactivas.discard(sesion.folio_sesion)
+            else:
+                self._activas.pop(sesion.folio_sesion, None)
+                self._inactivas.add(sesion.folio_sesion)
+
+    def revocar(self, *folios_sesion):
+        with self._candado:
+            for folio_sesion in folios_sesion:
+                self._activas.pop(folio_sesion, None)
+                self._inactivas.add(folio_sesion)
+
+
+sesiones_activas = SesionesActivas()
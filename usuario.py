@@ -1,76 +1,34 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
-from flask_cors import CORS
-from config import config as cn
-
-# Configuración de la aplicación y la base de datos
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = cn.DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Configuración de CORS
-CORS(app)
-CORS(app, resources={r"/*": {"origins": "*"}})
-
-# Inicialización de SQLAlchemy y Marshmallow
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
-
-# Definición del modelo Rol
-class Rol(db.Model):
-    id_rol = db.Column(db.Integer, primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    descripcion = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, nombre, descripcion):
-        self.nombre = nombre
-        self.descripcion = descripcion
-
-# Definición del modelo Usuario
-class Usuario(db.Model):
-    clv_usuario = db.Column(db.String(18), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    apellido1 = db.Column(db.String(255), nullable=False)
-    apellido2 = db.Column(db.String(255), nullable=False)
-    telefono = db.Column(db.String(255), nullable=False)
-    correo = db.Column(db.String(255), nullable=False)
-    direccion = db.Column(db.String(255), nullable=False)
-    id_rol = db.Column(db.Integer, db.ForeignKey('rol.id_rol'), nullable=True)
-    contrasenia = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, clv_usuario, nombre, apellido1, apellido2, telefono, correo, direccion, id_rol, contrasenia):
-        self.clv_usuario = clv_usuario
-        self.nombre = nombre
-        self.apellido1 = apellido1
-        self.apellido2 = apellido2
-        self.telefono = telefono
-        self.correo = correo
-        self.direccion = direccion
-        self.id_rol = id_rol
-        self.contrasenia = contrasenia
-
-with app.app_context():
-    db.create_all()
+from flask import Blueprint, jsonify, request
+from paginacion import paginar, igual
+from extensiones import db, ma
+from modelos import Usuario
+import credenciales
+
+bp = Blueprint('usuario', __name__)
 
 # Definición del esquema Usuario
 class UsuarioSchema(ma.Schema):
     class Meta:
         fields = ('clv_usuario', 'nombre', 'apellido1', 'apellido2', 'telefono', 'correo', 'direccion', 'id_rol', 'contrasenia')
+        # El hash de la contraseña nunca sale en las respuestas
+        load_only = ('contrasenia',)
 
 # Instancias de los esquemas
 usuario_schema = UsuarioSchema()
 usuarios_schema = UsuarioSchema(many=True)
 
+# Filtros aceptados por GET /usuario
+FILTROS_USUARIO = {
+    'id_rol': igual(Usuario.id_rol),
+}
+
 # GET todos los usuarios
-@app.route('/usuario', methods=['GET'])
+@bp.route('/usuario', methods=['GET'])
 def obtenerUsuarios():
-    todos_los_usuarios = Usuario.query.all()
-    consulta_usuarios = usuarios_schema.dump(todos_los_usuarios)
-    return jsonify(consulta_usuarios)
+    return paginar(Usuario.query, Usuario.clv_usuario, usuarios_schema, FILTROS_USUARIO)
 
 # GET un usuario por clave
-@app.route('/usuario/<string:clv_usuario>', methods=['GET'])
+@bp.route('/usuario/<string:clv_usuario>', methods=['GET'])
 def obtenerUsuario(clv_usuario):
     un_usuario = Usuario.query.get(clv_usuario)
     if un_usuario is None:
@@ -78,7 +36,7 @@ def obtenerUsuario(clv_usuario):
     return usuario_schema.jsonify(un_usuario)
 
 # POST nuevo usuario
-@app.route('/usuario/nuevo_usuario', methods=['POST'])
+@bp.route('/usuario/nuevo_usuario', methods=['POST'])
 def insertar_usuario():
     datosJSON = request.get_json(force=True)
     clv_usuario = datosJSON.get('clv_usuario')
@@ -94,13 +52,14 @@ def insertar_usuario():
     if not clv_usuario or not nombre or not apellido1 or not apellido2 or not telefono or not correo or not direccion or not contrasenia:
         return jsonify({'message': 'Faltan datos necesarios'}), 400
 
-    nuevo_usuario = Usuario(clv_usuario, nombre, apellido1, apellido2, telefono, correo, direccion, id_rol, contrasenia)
+    nuevo_usuario = Usuario(clv_usuario, nombre, apellido1, apellido2, telefono, correo, direccion, id_rol,
+                            credenciales.cifrar(contrasenia))
     db.session.add(nuevo_usuario)
     db.session.commit()
     return usuario_schema.jsonify(nuevo_usuario), 201
 
 # PUT actualizar usuario
-@app.route('/usuario/actualizar_usuario/<string:clv_usuario>', methods=['PUT'])
+@bp.route('/usuario/actualizar_usuario/<string:clv_usuario>', methods=['PUT'])
 def actualizarUsuario(clv_usuario):
     actualizar_usuario = Usuario.query.get(clv_usuario)
     if actualizar_usuario is None:
@@ -114,13 +73,15 @@ def actualizarUsuario(clv_usuario):
     actualizar_usuario.correo = datosJSON.get('correo', actualizar_usuario.correo)
     actualizar_usuario.direccion = datosJSON.get('direccion', actualizar_usuario.direccion)
     actualizar_usuario.id_rol = datosJSON.get('id_rol', actualizar_usuario.id_rol)
-    actualizar_usuario.contrasenia = datosJSON.get('contrasenia', actualizar_usuario.contrasenia)
+    if datosJSON.get('contrasenia'):
+        actualizar_usuario.contrasenia = credenciales.cifrar(datosJSON['contrasenia'])
 
     db.session.commit()
+    credenciales.invalidar(clv_usuario)
     return usuario_schema.jsonify(actualizar_usuario)
 
 # DELETE eliminar usuario
-@app.route('/usuario/eliminar_usuario/<string:clv_usuario>', methods=['DELETE'])
+@bp.route('/usuario/eliminar_usuario/<string:clv_usuario>', methods=['DELETE'])
 def eliminarUsuario(clv_usuario):
     eliminar_usuario = Usuario.query.get(clv_usuario)
     if eliminar_usuario is None:
@@ -128,20 +89,32 @@ def eliminarUsuario(clv_usuario):
 
     db.session.delete(eliminar_usuario)
     db.session.commit()
+    credenciales.invalidar(clv_usuario)
     return usuario_schema.jsonify(eliminar_usuario)
 
-# POST validar usuario
-@app.route('/usuario/validar_usuario', methods=['POST'])
+# POST validar usuario: el usuario siempre se lee de la base por su clave; una
+# credencial verificada hace poco contra el mismo hash se acepta sin recalcularlo,
+# si no, el hash se calcula en el pool de hilos de credenciales.py
+@bp.route('/usuario/validar_usuario', methods=['POST'])
 def validar_usuario():
     datosJSON = request.get_json(force=True)
     clv_usuario = datosJSON.get('clv_usuario')
     contrasenia = datosJSON.get('contrasenia')
+    if not isinstance(clv_usuario, str) or not isinstance(contrasenia, str) or not contrasenia:
+        return jsonify({'message': 'Usuario o contraseña incorrectos'}), 401
 
-    usuario = Usuario.query.filter_by(clv_usuario=clv_usuario, contrasenia=contrasenia).first()
-    if usuario is None:
+    usuario = Usuario.query.get(clv_usuario)
+    guardado = usuario.contrasenia if usuario else None
+    if credenciales.verificado_en_cache(clv_usuario, contrasenia, guardado):
+        return usuario_schema.jsonify(usuario)
+    if not credenciales.verificar(guardado, contrasenia):
         return jsonify({'message': 'Usuario o contraseña incorrectos'}), 401
-    return usuario_schema.jsonify(usuario)
 
-if __name__ == "__main__":
-    app.run(debug=True, port=4041, host="localhost")
+    # Migración transparente: las contraseñas en claro (o con otro método) se
+    # cifran la primera vez que el usuario inicia sesión
+    if credenciales.requiere_rehash(usuario.contrasenia):
+        usuario.contrasenia = credenciales.cifrar(contrasenia)
+        db.session.commit()
 
+    credenciales.guardar_verificado(clv_usuario, contrasenia, usuario.contrasenia)
+    return usuario_schema.jsonify(usuario)
@@ -1,131 +1,122 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_marshmallow import Marshmallow
-from flask_cors import CORS
-from config import config as cn
-
-# Configuración de la aplicación y la base de datos
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = cn.DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Configuración de CORS
-CORS(app)
-CORS(app, resources={r"/*": {"origins": "*"}})
-
-# Inicialización de SQLAlchemy y Marshmallow
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
-
-# Definición del modelo Rol
-class Rol(db.Model):
-    id_rol = db.Column(db.Integer, primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    descripcion = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, nombre, descripcion):
-        self.nombre = nombre
-        self.descripcion = descripcion
-
-# Definición del modelo Usuario
-class Usuario(db.Model):
-    clv_usuario = db.Column(db.String(18), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    apellido1 = db.Column(db.String(255), nullable=False)
-    apellido2 = db.Column(db.String(255), nullable=False)
-    telefono = db.Column(db.String(255), nullable=False)
-    correo = db.Column(db.String(255), nullable=False)
-    direccion = db.Column(db.String(255), nullable=False)
-    id_rol = db.Column(db.Integer, db.ForeignKey('rol.id_rol'), nullable=True)
-    contrasenia = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, clv_usuario, nombre, apellido1, apellido2, telefono, correo, direccion, id_rol, contrasenia):
-        self.clv_usuario = clv_usuario
-        self.nombre = nombre
-        self.apellido1 = apellido1
-        self.apellido2 = apellido2
-        self.telefono = telefono
-        self.correo = correo
-        self.direccion = direccion
-        self.id_rol = id_rol
-        self.contrasenia = contrasenia
-
-# Definición del modelo Cliente
-class Cliente(db.Model):
-    clv_cliente = db.Column(db.String(18), primary_key=True)
-    nombre = db.Column(db.String(255), nullable=False)
-    apellido1 = db.Column(db.String(255), nullable=False)
-    apellido2 = db.Column(db.String(255), nullable=False)
-    telefono = db.Column(db.String(255), nullable=False)
-    correo = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, clv_cliente, nombre, apellido1, apellido2, telefono, correo):
-        self.clv_cliente = clv_cliente
-        self.nombre = nombre
-        self.apellido1 = apellido1
-        self.apellido2 = apellido2
-        self.telefono = telefono
-        self.correo = correo
-
-# Definición del modelo Sesion
-class Sesion(db.Model):
-    folio_sesion = db.Column(db.String(18), primary_key=True)
-    clv_usuario = db.Column(db.String(18), db.ForeignKey('usuario.clv_usuario'), nullable=True)
-    fecha_inicio = db.Column(db.Date, nullable=False)
-    fecha_final = db.Column(db.Date, nullable=False)
-    estado = db.Column(db.String(255), nullable=False)
-
-    def __init__(self, folio_sesion, clv_usuario, fecha_inicio, fecha_final, estado):
-        self.folio_sesion = folio_sesion
-        self.clv_usuario = clv_usuario
-        self.fecha_inicio = fecha_inicio
-        self.fecha_final = fecha_final
-        self.estado = estado
-
-# Definición del modelo Venta
-class Venta(db.Model):
-    folio_venta = db.Column(db.String(18), primary_key=True)
-    folio_sesion = db.Column(db.String(18), db.ForeignKey('sesion.folio_sesion'), nullable=False)
-    clv_cliente = db.Column(db.String(18), db.ForeignKey('cliente.clv_cliente'), nullable=False)
-    fecha_venta = db.Column(db.Date, nullable=False)
-    total_venta = db.Column(db.Numeric(10,2), nullable=False)
-
-    def __init__(self, folio_venta, folio_sesion, clv_cliente, fecha_venta, total_venta):
-        self.folio_venta = folio_venta
-        self.folio_sesion = folio_sesion
-        self.clv_cliente = clv_cliente
-        self.fecha_venta = fecha_venta
-        self.total_venta = total_venta
-
-with app.app_context():
-    db.create_all()
+from functools import partial
+from flask import Blueprint, jsonify, request
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.exc import StaleDataError
+from paginacion import paginar, igual, desde, hasta
+from concurrencia import con_version, conflicto_version, verificar_if_match
+from idempotencia import confirmar, idempotente
+from exportacion import exportar
+from datetime import datetime
+from decimal import Decimal
+from extensiones import db, ma
+from modelos import Venta, DetalleVenta, Producto, Sesion, VentaDiaria
+from indice_productos import indice_productos
+from insercion_masiva import insertar_o_actualizar
+from inventario import VENTA, registrar_movimientos
+
+bp = Blueprint('venta', __name__)
 
 # Definición del esquema Venta
 class VentaSchema(ma.Schema):
     class Meta:
         fields = ('folio_venta', 'folio_sesion', 'clv_cliente', 'fecha_venta', 'total_venta')
 
+class DetalleVentaSchema(ma.Schema):
+    class Meta:
+        fields = ('id_detalle_venta', 'folio_venta', 'codigo_barras', 'cantidad', 'precio_venta')
+
+# Detalle con el nombre del producto, para imprimir el ticket
+class DetalleVentaProductoSchema(DetalleVentaSchema):
+    nombre_producto = ma.String(attribute='producto.nombre')
+
+    class Meta:
+        fields = DetalleVentaSchema.Meta.fields + ('nombre_producto',)
+
+class VentaConDetallesSchema(VentaSchema):
+    detalles = ma.Nested(DetalleVentaProductoSchema, many=True)
+
+    class Meta:
+        fields = VentaSchema.Meta.fields + ('detalles',)
+
 # Instancias de los esquemas
 venta_schema = VentaSchema()
 ventas_schema = VentaSchema(many=True)
+detalles_venta_schema = DetalleVentaSchema(many=True)
+venta_con_detalles_schema = VentaConDetallesSchema()
+
+def acumular_venta_diaria(venta, lineas):
+    """Suma las líneas de una venta al acumulado diario, dentro de la transacción del cobro."""
+    clv_usuario = (
+        db.session.query(Sesion.clv_usuario)
+        .filter(Sesion.folio_sesion == venta.folio_sesion)
+        .scalar()
+    )
+    acumulado = {}
+    for linea in lineas:
+        fila = acumulado.setdefault(linea['codigo_barras'], {
+            'fecha_venta': venta.fecha_venta,
+            'folio_sesion': venta.folio_sesion,
+            'codigo_barras': linea['codigo_barras'],
+            'clv_usuario': clv_usuario,
+            'cantidad': 0,
+            'importe': Decimal('0'),
+            'lineas': 0,
+        })
+        fila['cantidad'] += linea['cantidad']
+        fila['importe'] += Decimal(linea['precio_venta']) * linea['cantidad']
+        fila['lineas'] += 1
+    # Mismo orden de filas en todos los cobros para no provocar bloqueos cruzados
+    insertar_o_actualizar(
+        VentaDiaria.__table__,
+        [acumulado[codigo] for codigo in sorted(acumulado)],
+        llaves=('fecha_venta', 'folio_sesion', 'codigo_barras'),
+        incrementar=('cantidad', 'importe', 'lineas'),
+    )
+
+# Filtros aceptados por GET /venta
+FILTROS_VENTA = {
+    'desde': desde(Venta.fecha_venta),
+    'hasta': hasta(Venta.fecha_venta),
+    'folio_sesion': igual(Venta.folio_sesion),
+    'clv_cliente': igual(Venta.clv_cliente),
+}
 
 # GET todas las ventas
-@app.route('/venta', methods=['GET'])
+@bp.route('/venta', methods=['GET'])
 def obtenerVentas():
-    todas_las_ventas = Venta.query.all()
-    consulta_ventas = ventas_schema.dump(todas_las_ventas)
-    return jsonify(consulta_ventas)
+    return paginar(Venta.query, Venta.folio_venta, ventas_schema, FILTROS_VENTA)
+
+# GET exportar todas las ventas en streaming (NDJSON o arreglo JSON)
+@bp.route('/venta/exportar', methods=['GET'])
+def exportarVentas():
+    return exportar(Venta.query, Venta.folio_venta, venta_schema)
 
 # GET una venta por folio
-@app.route('/venta/<string:folio_venta>', methods=['GET'])
+@bp.route('/venta/<string:folio_venta>', methods=['GET'])
 def obtenerVenta(folio_venta):
     una_venta = Venta.query.get(folio_venta)
     if una_venta is None:
         return jsonify({'message': 'Venta no encontrada'}), 404
-    return venta_schema.jsonify(una_venta)
+    return con_version(venta_schema.jsonify(una_venta), una_venta.version)
+
+# GET una venta con sus detalles y el nombre de cada producto en una sola consulta
+@bp.route('/venta/<string:folio_venta>/detalles', methods=['GET'])
+def obtenerVentaConDetalles(folio_venta):
+    una_venta = (
+        Venta.query
+        .options(joinedload(Venta.detalles).joinedload(DetalleVenta.producto).load_only(Producto.nombre))
+        .filter(Venta.folio_venta == folio_venta)
+        .one_or_none()
+    )
+    if una_venta is None:
+        return jsonify({'message': 'Venta no encontrada'}), 404
+    return con_version(venta_con_detalles_schema.jsonify(una_venta), una_venta.version)
 
 # POST nueva venta
-@app.route('/venta/nueva_venta', methods=['POST'])
+@bp.route('/venta/nueva_venta', methods=['POST'])
+@idempotente
 def insertar_venta():
     datosJSON = request.get_json(force=True)
     folio_venta = datosJSON.get('folio_venta')
@@ -139,15 +130,110 @@ def insertar_venta():
 
     nueva_venta = Venta(folio_venta, folio_sesion, clv_cliente, fecha_venta, total_venta)
     db.session.add(nueva_venta)
-    db.session.commit()
+    try:
+        confirmar()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'El folio ya existe o la venta hace referencia a datos inexistentes'}), 409
     return venta_schema.jsonify(nueva_venta), 201
 
+# POST cobrar venta: encabezado, detalles y descuento de existencias en una sola transacción
+@bp.route('/venta/cobrar', methods=['POST'])
+@idempotente
+def cobrar_venta():
+    datosJSON = request.get_json(force=True)
+    if not isinstance(datosJSON, dict):
+        return jsonify({'message': 'El cuerpo debe ser un objeto JSON'}), 400
+    folio_venta = datosJSON.get('folio_venta')
+    folio_sesion = datosJSON.get('folio_sesion')
+    clv_cliente = datosJSON.get('clv_cliente')
+    fecha_venta = datosJSON.get('fecha_venta')
+    detalles = datosJSON.get('detalles')
+
+    if not folio_venta or not folio_sesion or not clv_cliente or not fecha_venta or not detalles:
+        return jsonify({'message': 'Faltan datos necesarios'}), 400
+    try:
+        fecha_venta = datetime.strptime(fecha_venta, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return jsonify({'message': 'fecha_venta debe tener el formato AAAA-MM-DD'}), 400
+    if not isinstance(detalles, list):
+        return jsonify({'message': 'detalles debe ser una lista'}), 400
+
+    # Cantidad total pedida por producto (un producto puede venir en varias líneas)
+    cantidades = {}
+    for detalle in detalles:
+        if not isinstance(detalle, dict):
+            return jsonify({'message': 'Detalle de venta inválido', 'detalle': detalle}), 400
+        codigo_barras = detalle.get('codigo_barras')
+        cantidad = detalle.get('cantidad')
+        if not isinstance(codigo_barras, str) or not codigo_barras or not isinstance(cantidad, int) or isinstance(cantidad, bool) or cantidad <= 0:
+            return jsonify({'message': 'Detalle de venta inválido', 'detalle': detalle}), 400
+        cantidades[codigo_barras] = cantidades.get(codigo_barras, 0) + cantidad
+
+    precios = dict(
+        Producto.query
+        .with_entities(Producto.codigo_barras, Producto.precio)
+        .filter(Producto.codigo_barras.in_(cantidades))
+        .all()
+    )
+    no_encontrados = [codigo for codigo in cantidades if codigo not in precios]
+    if no_encontrados:
+        return jsonify({'message': 'Producto no encontrado', 'codigos_barras': no_encontrados}), 404
+
+    # El precio y el total se calculan en el servidor a partir del catálogo
+    lineas = [{
+        'folio_venta': folio_venta,
+        'codigo_barras': detalle['codigo_barras'],
+        'cantidad': detalle['cantidad'],
+        'precio_venta': precios[detalle['codigo_barras']],
+    } for detalle in detalles]
+    total_venta = sum((Decimal(linea['precio_venta']) * linea['cantidad'] for linea in lineas), Decimal('0'))
+
+    nueva_venta = Venta(folio_venta, folio_sesion, clv_cliente, fecha_venta, total_venta)
+    try:
+        db.session.add(nueva_venta)
+        db.session.flush()
+        db.session.execute(DetalleVenta.__table__.insert(), lineas)
+
+        # Un solo UPDATE descuenta todas las existencias; la condición evita vender de más
+        descuento = case(cantidades, value=Producto.codigo_barras)
+        resultado = db.session.execute(
+            Producto.__table__.update()
+            .where(Producto.codigo_barras.in_(cantidades))
+            .where(Producto.cantidad_actual >= descuento)
+            .values(cantidad_actual=Producto.cantidad_actual - descuento)
+        )
+        if resultado.rowcount != len(cantidades):
+            db.session.rollback()
+            sin_existencia = [
+                codigo for codigo, cantidad_actual in
+                Producto.query
+                .with_entities(Producto.codigo_barras, Producto.cantidad_actual)
+                .filter(Producto.codigo_barras.in_(cantidades))
+                if cantidad_actual < cantidades[codigo]
+            ]
+            return jsonify({'message': 'Existencias insuficientes', 'codigos_barras': sin_existencia}), 409
+
+        registrar_movimientos(VENTA, {codigo: -cantidad for codigo, cantidad in cantidades.items()}, folio_venta)
+        acumular_venta_diaria(nueva_venta, lineas)
+        confirmar(partial(indice_productos.invalidar, *cantidades))
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'La venta ya existe o hace referencia a datos inexistentes'}), 409
+
+    respuesta = venta_schema.dump(nueva_venta)
+    respuesta['detalles'] = detalles_venta_schema.dump(lineas)
+    return jsonify(respuesta), 201
+
 # PUT actualizar venta
-@app.route('/venta/actualizar_venta/<string:folio_venta>', methods=['PUT'])
+@bp.route('/venta/actualizar_venta/<string:folio_venta>', methods=['PUT'])
 def actualizarVenta(folio_venta):
     actualizar_venta = Venta.query.get(folio_venta)
     if actualizar_venta is None:
         return jsonify({'message': 'Venta no encontrada'}), 404
+    error = verificar_if_match(actualizar_venta.version)
+    if error is not None:
+        return error
 
     datosJSON = request.get_json(force=True)
     actualizar_venta.folio_sesion = datosJSON.get('folio_sesion', actualizar_venta.folio_sesion)
@@ -155,11 +241,16 @@ def actualizarVenta(folio_venta):
     actualizar_venta.fecha_venta = datosJSON.get('fecha_venta', actualizar_venta.fecha_venta)
     actualizar_venta.total_venta = datosJSON.get('total_venta', actualizar_venta.total_venta)
 
-    db.session.commit()
-    return venta_schema.jsonify(actualizar_venta)
+    # Otra petición escribió entre la lectura y el UPDATE
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return conflicto_version(db.session.query(Venta.version).filter_by(folio_venta=folio_venta).scalar())
+    return con_version(venta_schema.jsonify(actualizar_venta), actualizar_venta.version)
 
 # DELETE eliminar venta
-@app.route('/venta/eliminar_venta/<string:folio_venta>', methods=['DELETE'])
+@bp.route('/venta/eliminar_venta/<string:folio_venta>', methods=['DELETE'])
 def eliminarVenta(folio_venta):
     eliminar_venta = Venta.query.get(folio_venta)
     if eliminar_venta is None:
@@ -168,7 +259,3 @@ def eliminarVenta(folio_venta):
     db.session.delete(eliminar_venta)
     db.session.commit()
     return venta_schema.jsonify(eliminar_venta)
-
-if __name__ == "__main__":
-    app.run(debug=True, port=4044, host="localhost")
-